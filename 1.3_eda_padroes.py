@@ -2,25 +2,29 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 import numpy as np
+from esquema_bases import ler_base
+from cubo_climatico import CuboClimatico
+from eventos_extremos import carregar_tabelas_eventos, LIMIARES_PADRAO
 
 # Configuração global para estilo dos gráficos
 sns.set(style="whitegrid")
 
 # Etapa 1: Carregar as bases tratadas
 try:
-    df_operacional = pd.read_csv('base_operacional_tratada.csv', delimiter=';', encoding='utf-8')
-    df_clima = pd.read_csv('base_climatica_tratada.csv', delimiter=';', encoding='utf-8')
+    # Apenas as colunas usadas nos gráficos são lidas
+    df_operacional = ler_base('base_operacional_tratada.csv', 'operacional', usecols=['data_servico'])
+    # As leituras climáticas vêm do cubo estação × hora mapeado em memória
+    df_clima = CuboClimatico.carregar().leituras(list(LIMIARES_PADRAO))
+    tabelas_eventos = carregar_tabelas_eventos()
     print("Bases tratadas carregadas com sucesso!")
 except FileNotFoundError as e:
     print(f"Erro ao carregar as bases: {e}")
     exit()
 
 # Etapa 2: Converter colunas de data para datetime
-df_clima['Data'] = pd.to_datetime(df_clima['Data'], errors='coerce', dayfirst=True)
 df_operacional['data_servico'] = pd.to_datetime(df_operacional['data_servico'], errors='coerce', dayfirst=True)
 
 # Remover valores nulos nas datas
-df_clima.dropna(subset=['Data'], inplace=True)
 df_operacional.dropna(subset=['data_servico'], inplace=True)
 
 # Etapa 3: Histogramas
@@ -42,16 +46,10 @@ plt.savefig('histogramas_climaticos.png')
 plt.show()
 
 # Etapa 4: Gráficos de Dispersão
-# Relacionar eventos extremos com ocorrências operacionais
-eventos_extremos = df_clima[
-    (df_clima['PRECIPITAÇÃO TOTAL, HORÁRIO (mm)'] > 50) |
-    (df_clima['VENTO, RAJADA MAXIMA (m/s)'] > 15) |
-    (df_clima['TEMPERATURA MÁXIMA NA HORA ANT. (AUT) (°C)'] > 40)
-]
-eventos_extremos['AnoMes'] = eventos_extremos['Data'].dt.to_period('M')
+# Relacionar eventos extremos (contagens mensais pré-calculadas) com ocorrências operacionais
 df_operacional['AnoMes'] = df_operacional['data_servico'].dt.to_period('M')
 
-eventos_por_mes = eventos_extremos.groupby('AnoMes').size()
+eventos_por_mes = tabelas_eventos['por_mes']
 ocorrencias_por_mes = df_operacional.groupby('AnoMes').size()
 
 dados_consolidados = pd.DataFrame({
@@ -1,32 +1,17 @@
 import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
+from eventos_extremos import carregar_tabelas_eventos, descrever_limiares
 
-# Carregar a base tratada
+# Carregar as contagens de eventos extremos por data e estação (pré-calculadas em cache)
 try:
-    df_tratada = pd.read_csv('base_climatica_tratada.csv', delimiter=';', encoding='utf-8')
-    print("Base climática tratada carregada com sucesso!")
+    tabelas_eventos = carregar_tabelas_eventos()
+    print("Tabelas de eventos extremos carregadas com sucesso!")
 except FileNotFoundError as e:
     print(f"Erro ao carregar a base: {e}")
     exit()
 
-# Converter a coluna de data para o formato datetime
-df_tratada['Data'] = pd.to_datetime(df_tratada['Data'], errors='coerce')
-
-# Filtrar apenas as colunas relevantes para eventos extremos
-eventos_extremos = df_tratada[
-    (df_tratada['PRECIPITAÇÃO TOTAL, HORÁRIO (mm)'] > 50) |  # Exemplo: Chuva maior que 50mm
-    (df_tratada['VENTO, RAJADA MAXIMA (m/s)'] > 15) |        # Exemplo: Rajadas de vento > 15 m/s
-    (df_tratada['TEMPERATURA MÁXIMA NA HORA ANT. (AUT) (°C)'] > 40)  # Exemplo: Temperatura maior que 40ºC
-]
-
-# Agrupar por data e estação para contar eventos extremos
-eventos_extremos_agrupados = (
-    eventos_extremos
-    .groupby(['Data', 'ESTACAO'])
-    .size()
-    .reset_index(name='Ocorrencias')
-)
+eventos_extremos_agrupados = tabelas_eventos['por_dia_estacao']
 
 # Adicionar uma coluna com mês e ano no formato desejado (ex: Jan/2020 em português)
 eventos_extremos_agrupados['MesAno'] = eventos_extremos_agrupados['Data'].dt.strftime('%b/%Y').str.capitalize()
@@ -83,12 +68,7 @@ ax.set_ylabel('Número de Eventos Extremos', fontsize=12)
 legenda = ax.legend(title='Estação Automática', fontsize=10, title_fontsize=12, loc='upper right', ncol=1)
 
 # Adicionar a caixa de explicação ao lado esquerdo da legenda
-caixa_texto = (
-    "Critérios para Eventos Climáticos Extremos:\n"
-    "- Precipitação > 50 mm\n"
-    "- Rajadas de vento > 15 m/s\n"
-    "- Temperatura máxima > 40ºC"
-)
+caixa_texto = descrever_limiares()
 props = dict(boxstyle='round', facecolor='lightgrey', alpha=0.7, edgecolor='black')
 
 # Posição da caixa ajustada manualmente ao lado da legenda
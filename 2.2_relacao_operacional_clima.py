@@ -1,10 +1,12 @@
 import pandas as pd
 import matplotlib.pyplot as plt
+from esquema_bases import ler_base
+from eventos_extremos import carregar_tabelas_eventos
 
 # Etapa 1: Carregar as bases tratadas
 try:
-    df_operacional = pd.read_csv('base_operacional_tratada.csv', delimiter=';', encoding='utf-8')
-    df_clima = pd.read_csv('base_climatica_tratada.csv', delimiter=';', encoding='utf-8')
+    df_operacional = ler_base('base_operacional_tratada.csv', 'operacional', usecols=['tipo_servico', 'data_servico'])
+    tabelas_eventos = carregar_tabelas_eventos()
     print("Bases tratadas carregadas com sucesso!")
 except FileNotFoundError as e:
     print(f"Erro ao carregar as bases: {e}")
@@ -16,24 +18,15 @@ df_operacional_filtrado = df_operacional[
 ]
 
 # Converter colunas de data para datetime
-df_clima['Data'] = pd.to_datetime(df_clima['Data'], errors='coerce', dayfirst=True)
 df_operacional_filtrado['data_servico'] = pd.to_datetime(df_operacional_filtrado['data_servico'], errors='coerce', dayfirst=True)
 
 # Remover valores nulos nas datas
-df_clima.dropna(subset=['Data'], inplace=True)
 df_operacional_filtrado.dropna(subset=['data_servico'], inplace=True)
 
-# Filtrar eventos climáticos extremos
-eventos_extremos = df_clima[
-    (df_clima['PRECIPITAÇÃO TOTAL, HORÁRIO (mm)'] > 50) |
-    (df_clima['VENTO, RAJADA MAXIMA (m/s)'] > 15) |
-    (df_clima['TEMPERATURA MÁXIMA NA HORA ANT. (AUT) (°C)'] > 40)
-]
-
-# Agrupar por Ano/Mês
-eventos_extremos['AnoMes'] = eventos_extremos['Data'].dt.to_period('M')
-eventos_por_mes = eventos_extremos.groupby('AnoMes').size()
+# Eventos climáticos extremos já agrupados por Ano/Mês
+eventos_por_mes = tabelas_eventos['por_mes']
 
+# Agrupar ocorrências por Ano/Mês
 df_operacional_filtrado['AnoMes'] = df_operacional_filtrado['data_servico'].dt.to_period('M')
 ocorrencias_por_mes = df_operacional_filtrado.groupby('AnoMes').size()
 
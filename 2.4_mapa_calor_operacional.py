@@ -1,40 +1,58 @@
+import argparse
+
 import pandas as pd
-import geopandas as gpd
 import folium
 from folium.plugins import HeatMap
+from esquema_bases import ler_base
+from camada_goias import carregar_camada_goias, geojson_camada
+from agregacao_espacial import agregar_em_grade, agregar_por_grupo, tamanho_celula_para_zoom, pontos_mapa_calor
 from folium.features import DivIcon  # Importação correta do DivIcon
 
+# `--mes AAAA-MM` gera o mapa de um único mês; `--por-municipio` acrescenta uma camada de calor por município
+parser = argparse.ArgumentParser(description="Mapa de calor das ocorrências operacionais.")
+parser.add_argument('--mes', default=None, help="Mês (AAAA-MM) a mapear; padrão: todo o período.")
+parser.add_argument('--por-municipio', action='store_true', help="Uma camada de calor por município.")
+args = parser.parse_args()
+
+ARQUIVO_MAPA = 'mapa_calor_goias_com_municipios_e_marcadores.html'
+if args.mes:
+    ARQUIVO_MAPA = f'mapa_calor_goias_com_municipios_e_marcadores_{args.mes}.html'
+
 # Etapa 1: Carregar a base tratada
 try:
-    df_tratada = pd.read_csv('base_operacional_tratada.csv', delimiter=';', encoding='utf-8')
+    colunas = ['latitude', 'longitude', 'data_servico']
+    if args.por_municipio:
+        # A coluna `municipio` só existe se o 1.2 conseguiu atribuir o município IBGE (shapefile e geopandas/shapely)
+        cabecalho = pd.read_csv('base_operacional_tratada.csv', delimiter=';', encoding='utf-8', nrows=0).columns
+        if 'municipio' in cabecalho:
+            colunas.append('municipio')
+        else:
+            print("Aviso: a base tratada não tem a coluna 'municipio'; as camadas por município serão omitidas.")
+            args.por_municipio = False
+    df_tratada = ler_base('base_operacional_tratada.csv', 'operacional', usecols=colunas)
     print("Base tratada carregada com sucesso!")
 except FileNotFoundError as e:
     print(f"Erro ao carregar o arquivo: {e}")
     exit()
 
-# Etapa 2: Carregar o shapefile do estado de Goiás
+if args.mes:
+    df_tratada = df_tratada[df_tratada['data_servico'].dt.to_period('M') == pd.Period(args.mes, freq='M')]
+    print(f"{len(df_tratada)} ocorrências em {args.mes}.")
+
+# Etapa 2: Carregar a camada de municípios de Goiás (já em WGS84, simplificada e com centroides, do cache GeoParquet)
 try:
-    goias_shape = gpd.read_file('shapefile/goias_shapefile.shp', encoding='utf-8')  # Garantir codificação correta
+    goias_shape = carregar_camada_goias()
     print("Shapefile do estado de Goiás carregado com sucesso!")
 except FileNotFoundError as e:
     print(f"Erro ao carregar o shapefile: {e}")
     exit()
 
-# Definir o CRS original se não estiver definido
-if goias_shape.crs is None:
-    goias_shape.set_crs(epsg=4674, inplace=True)  # Definir o CRS original, ajuste se necessário
-
-# Transformar para WGS84 (EPSG:4326) para compatibilidade com Folium
-goias_shape = goias_shape.to_crs(epsg=4326)
-
-# Etapa 3: Filtrar coordenadas válidas
-df_tratada['latitude'] = pd.to_numeric(df_tratada['latitude'], errors='coerce')
-df_tratada['longitude'] = pd.to_numeric(df_tratada['longitude'], errors='coerce')
+# Etapa 3: Filtrar coordenadas válidas (já numéricas na base tratada)
 geo_data = df_tratada.dropna(subset=['latitude', 'longitude'])
 
 # Etapa 4: Criar o mapa de calor
 # Converter shapefile para GeoJSON para sobreposição no folium
-geojson_data = goias_shape.to_json()
+geojson_data = geojson_camada(goias_shape)
 
 # Criar o mapa base
 m = folium.Map(location=[-16.3333, -49.6667], zoom_start=7)  # Coordenadas centrais de Goiás
@@ -42,24 +60,33 @@ m = folium.Map(location=[-16.3333, -49.6667], zoom_start=7)  # Coordenadas centr
 # Adicionar o contorno do estado
 folium.GeoJson(geojson_data, name="Goiás").add_to(m)
 
-# Adicionar mapa de calor
-heat_data = list(zip(geo_data['latitude'], geo_data['longitude']))
-HeatMap(heat_data, radius=15, blur=10, max_zoom=10).add_to(m)
+# Adicionar mapa de calor a partir das ocorrências agregadas em grade (apenas as células ocupadas vão para o HTML)
+ZOOM_MAXIMO = 10
+celulas = agregar_em_grade(geo_data['latitude'], geo_data['longitude'], tamanho_celula_para_zoom(ZOOM_MAXIMO))
+print(f"{len(geo_data)} ocorrências agregadas em {len(celulas)} células.")
+HeatMap(pontos_mapa_calor(celulas), radius=15, blur=10, max_zoom=ZOOM_MAXIMO, name="Todas as ocorrências").add_to(m)
+
+# Camadas por município (desligadas por padrão, selecionáveis no controle de camadas)
+if args.por_municipio:
+    celulas_municipio = agregar_por_grupo(geo_data, 'municipio', tamanho_celula_para_zoom(ZOOM_MAXIMO))
+    for municipio, celulas_grupo in celulas_municipio.groupby('municipio', observed=True, sort=True):
+        HeatMap(pontos_mapa_calor(celulas_grupo), radius=15, blur=10, max_zoom=ZOOM_MAXIMO,
+                name=str(municipio), show=False).add_to(m)
+    print(f"{celulas_municipio['municipio'].nunique() if len(celulas_municipio) else 0} camadas por município adicionadas.")
 
 # Etapa 5: Adicionar nomes e marcadores dos municípios de interesse
 municipios_interesse = ["Goiânia", "São Luís de Montes Belos", "Goianésia"]
 municipios_shape = goias_shape[goias_shape['NM_MUN'].isin(municipios_interesse)]
 
-# Calcular os centroides dos municípios selecionados
-municipios_shape['centroid'] = municipios_shape.geometry.centroid
+# Centroides pré-calculados (em projeção métrica) na camada em cache
 for _, row in municipios_shape.iterrows():
     try:
-        centroid = row['centroid']
+        centroide = [row['centroide_lat'], row['centroide_lon']]
         municipio = row['NM_MUN']
 
         # Adicionar marcador para cada município
         folium.Marker(
-            location=[centroid.y, centroid.x],
+            location=centroide,
             icon=folium.Icon(color="blue", icon="info-sign"),
             popup=f'<b>{municipio}</b>',
             tooltip=f'Clique para mais informações: {municipio}'
@@ -67,19 +94,19 @@ for _, row in municipios_shape.iterrows():
 
         # Adicionar o nome do município diretamente no mapa
         folium.map.Marker(
-            location=[centroid.y, centroid.x],
+            location=centroide,
             icon=DivIcon(
                 icon_size=(150, 36),
                 icon_anchor=(0, 0),
                 html=f'<div style="font-size: 12px; color: black;"><b>{municipio}</b></div>',
             ),
         ).add_to(m)
-    except AttributeError as e:
+    except KeyError as e:
         print(f"Erro ao adicionar nome ou marcador do município: {e}")
 
 # Adicionar controle de camadas
 folium.LayerControl().add_to(m)
 
 # Salvar o mapa em um arquivo HTML
-m.save('mapa_calor_goias_com_municipios_e_marcadores.html')
-print("Mapa de calor gerado e salvo como 'mapa_calor_goias_com_municipios_e_marcadores.html'.")
+m.save(ARQUIVO_MAPA)
+print(f"Mapa de calor gerado e salvo como '{ARQUIVO_MAPA}'.")
@@ -1,60 +1,53 @@
 import pandas as pd
-import geopandas as gpd
 import folium
 from folium.plugins import HeatMap
+from esquema_bases import ler_base
+from camada_goias import carregar_camada_goias, geojson_camada
+from agregacao_espacial import agregar_em_grade, tamanho_celula_para_zoom, pontos_mapa_calor
 
 # Etapa 1: Carregar a base tratada
 try:
-    df_tratada = pd.read_csv('base_operacional_tratada.csv', delimiter=';', encoding='utf-8')
+    df_tratada = ler_base('base_operacional_tratada.csv', 'operacional', usecols=['latitude', 'longitude'])
     print("Base tratada carregada com sucesso!")
 except FileNotFoundError as e:
     print(f"Erro ao carregar o arquivo: {e}")
     exit()
 
-# Etapa 2: Carregar o shapefile do estado de Goiás
+# Etapa 2: Carregar a camada de municípios de Goiás (já em WGS84, simplificada e com centroides, do cache GeoParquet)
 try:
-    goias_shape = gpd.read_file('shapefile/goias_shapefile.shp')  # Substitua pelo caminho do seu shapefile
+    goias_shape = carregar_camada_goias()
     print("Shapefile do estado de Goiás carregado com sucesso!")
 except FileNotFoundError as e:
     print(f"Erro ao carregar o shapefile: {e}")
     exit()
 
-# Definir o CRS original se não estiver definido
-if goias_shape.crs is None:
-    goias_shape.set_crs(epsg=4674, inplace=True)  # Definir o CRS original, ajuste se necessário
-
-# Transformar para WGS84 (EPSG:4326) para compatibilidade com Folium
-goias_shape = goias_shape.to_crs(epsg=4326)
-
-# Etapa 3: Filtrar coordenadas válidas para o mapa de calor
-df_tratada['latitude'] = pd.to_numeric(df_tratada['latitude'], errors='coerce')
-df_tratada['longitude'] = pd.to_numeric(df_tratada['longitude'], errors='coerce')
+# Etapa 3: Filtrar coordenadas válidas (já numéricas na base tratada) para o mapa de calor
 geo_data = df_tratada.dropna(subset=['latitude', 'longitude'])
 
 # Criar o mapa base
 m = folium.Map(location=[-16.3333, -49.6667], zoom_start=7)  # Coordenadas centrais de Goiás
 
 # Adicionar o contorno do estado
-geojson_data = goias_shape.to_json()
+geojson_data = geojson_camada(goias_shape)
 folium.GeoJson(geojson_data, name="Goiás").add_to(m)
 
-# Adicionar mapa de calor
-heat_data = list(zip(geo_data['latitude'], geo_data['longitude']))
-HeatMap(heat_data, radius=15, blur=10, max_zoom=10).add_to(m)
+# Adicionar mapa de calor a partir das ocorrências agregadas em grade (apenas as células ocupadas vão para o HTML)
+ZOOM_MAXIMO = 10
+celulas = agregar_em_grade(geo_data['latitude'], geo_data['longitude'], tamanho_celula_para_zoom(ZOOM_MAXIMO))
+print(f"{len(geo_data)} ocorrências agregadas em {len(celulas)} células.")
+HeatMap(pontos_mapa_calor(celulas), radius=15, blur=10, max_zoom=ZOOM_MAXIMO).add_to(m)
 
 # Adicionar nomes visíveis dos municípios de interesse (Goiânia, São Luís de Montes Belos e Goianésia)
-municipios_interesse = {
-    "GOIANIA": [-16.642778, -49.270278],  # Movido significativamente para a esquerda
-    "SÃO LUÍS DE MONTES BELOS": [-16.521, -50.3725],
-    "GOIANÉSIA": [-15.317, -49.1167]
-}
+# As posições são os centroides IBGE da camada de municípios, e não coordenadas digitadas
+municipios_interesse = ["Goiânia", "São Luís de Montes Belos", "Goianésia"]
+municipios_shape = goias_shape[goias_shape['NM_MUN'].isin(municipios_interesse)]
 
-for municipio, coord in municipios_interesse.items():
+for _, row in municipios_shape.iterrows():
     folium.Marker(
-        location=coord,
+        location=[row['centroide_lat'], row['centroide_lon']],
         icon=None,
         popup=None,
-        tooltip=municipio
+        tooltip=row['NM_MUN'].upper()
     ).add_to(m)
 
 # Adicionar marcadores das Estações Automáticas de Clima com ícone de nuvem e cor vermelha
@@ -1,52 +1,74 @@
+import argparse
 import pandas as pd
 import numpy as np
-from scipy.spatial import cKDTree
+from fusao_estacoes import fundir_por_estacao, fundir_por_interpolacao, fundir_por_cubo, criar_variavel_alvo
+from cubo_climatico import CuboClimatico, PASTA_CUBO
+from esquema_bases import ler_base
+from base_colunar import salvar_base_fusionada_parquet, CAMINHO_PARQUET_FUSIONADA
+
+# ⚙️ Tolerância máxima entre a ocorrência e a leitura horária da estação
+# `data_servico` (horário local, só a data) é convertida para UTC e posicionada ao meio-dia
+# local antes da junção, pois as leituras do INMET estão em UTC (ver `fusao_estacoes.instante_utc`)
+TOLERANCIA_FUSAO = "1h"
+
+# ⚙️ Modo de fusão: estação mais próxima (padrão), interpolação IDW das k estações mais próximas
+# ou leitura direta no cubo estação × hora do 1.1 (`cubo`: só as leituras de COLUNAS_REAIS, da hora
+# cheia mais próxima, sem procurar a leitura vizinha quando ela falta; ver `fundir_por_cubo`)
+parser = argparse.ArgumentParser(description="Fusão das bases climática e operacional.")
+parser.add_argument("--modo", choices=["estacao", "idw", "cubo"], default="estacao", help="Estratégia de fusão.")
+parser.add_argument("--k", type=int, default=3, help="Estações usadas na interpolação (modo idw).")
+parser.add_argument("--potencia", type=float, default=2, help="Expoente do inverso da distância (modo idw).")
+args = parser.parse_args()
 
 # 📌 1️⃣ Carregar bases de dados
+# No modo `cubo` o clima vem do cubo estação × hora gerado pelo 1.1 (mapeado em memória)
 print("📥 Carregando bases de dados...")
-df_climatica = pd.read_csv("base_climatica_tratada.csv", delimiter=";", encoding="utf-8")
-df_operacional = pd.read_csv("base_operacional_tratada.csv", delimiter=";", encoding="utf-8")
-
-print(f"✅ Base climática carregada com {df_climatica.shape[0]} registros e {df_climatica.shape[1]} colunas.")
+if args.modo == "cubo":
+    cubo = CuboClimatico.carregar()
+    df_climatica = None
+    print(f"✅ Cubo climático `{PASTA_CUBO}/` aberto: {cubo.valores.shape} (estação × hora × variável).")
+else:
+    cubo = None
+    df_climatica = ler_base("base_climatica_tratada.csv", "clima")
+    print(f"✅ Base climática carregada com {df_climatica.shape[0]} registros e {df_climatica.shape[1]} colunas.")
+df_operacional = ler_base("base_operacional_tratada.csv", "operacional")
 print(f"✅ Base operacional carregada com {df_operacional.shape[0]} registros e {df_operacional.shape[1]} colunas.")
 
-# 📌 2️⃣ Converter colunas de data para datetime
-print("📆 Convertendo colunas de data para o formato datetime...")
-df_climatica["Data"] = pd.to_datetime(df_climatica["Data"], errors='coerce')
-df_operacional["data_servico"] = pd.to_datetime(df_operacional["data_servico"], errors='coerce')
-
-# 📌 3️⃣ Determinar a estação meteorológica mais próxima para cada ocorrência (Usando KDTree)
-print("📍 Associando cada ocorrência à estação meteorológica mais próxima...")
-
-# Criando matriz de coordenadas das estações meteorológicas
-coord_estacoes = df_climatica[["LATITUDE", "LONGITUDE"]].to_numpy()
-tree = cKDTree(coord_estacoes)  # Criando KDTree para busca rápida
+# 📌 2️⃣ Tipos declarados em `esquema_bases` (categorias, float32 e datas já convertidas na leitura)
+memoria_clima = cubo.valores.nbytes if cubo is not None else df_climatica.memory_usage(deep=True).sum()
+print(f"📦 Memória: climática {memoria_clima / 1e6:.1f} MB, "
+      f"operacional {df_operacional.memory_usage(deep=True).sum() / 1e6:.1f} MB.")
 
-# Criando matriz de coordenadas das ocorrências operacionais
-coord_ocorrencias = df_operacional[["latitude", "longitude"]].dropna().to_numpy()
-
-# Encontrando a estação mais próxima para cada ocorrência
-distancias, indices = tree.query(coord_ocorrencias)
-
-# Mapeando índices das estações às ocorrências
-df_operacional.loc[df_operacional[["latitude", "longitude"]].dropna().index, "estacao_proxima"] = indices
-
-# Juntando os dados climáticos às ocorrências operacionais
-df_climatica = df_climatica.reset_index()
-df_operacional = df_operacional.merge(df_climatica, left_on="estacao_proxima", right_on="index", how="left").drop(columns=["index", "estacao_proxima"])
+# 📌 3️⃣ Associar cada ocorrência às leituras horárias das estações
+if args.modo == "idw":
+    # Média ponderada pelo inverso da distância das k estações mais próximas, na mesma hora
+    print(f"📍 Interpolando o clima das {args.k} estações mais próximas (IDW, potência {args.potencia:g})...")
+    df_operacional = fundir_por_interpolacao(
+        df_operacional, df_climatica, k=args.k, potencia=args.potencia, tolerancia=TOLERANCIA_FUSAO
+    )
+elif args.modo == "cubo":
+    # Leitura direta `valores[estacao, hora]` da estação mais próxima, sem junção
+    print(f"📍 Associando cada ocorrência à estação mais próxima pelo cubo (tolerância de {TOLERANCIA_FUSAO})...")
+    df_operacional = fundir_por_cubo(df_operacional, cubo, tolerancia=TOLERANCIA_FUSAO)
+else:
+    # O KDTree é montado apenas sobre as estações distintas e a leitura é escolhida
+    # por junção as-of entre `data_servico` e `Data_Hora` dentro da tolerância
+    print(f"📍 Associando cada ocorrência à estação mais próxima (tolerância de {TOLERANCIA_FUSAO})...")
+    df_operacional = fundir_por_estacao(df_operacional, df_climatica, tolerancia=TOLERANCIA_FUSAO)
 
 print(f"✅ Estações associadas! {df_operacional.shape[0]} registros processados.")
 
 # 📌 4️⃣ Criar variável alvo binária `qtd_atividade_bin`
 print("🎯 Criando variável alvo binária `qtd_atividade_bin`...")
 
-df_operacional["qtd_atividade"] = df_operacional["qtd_atividade"].astype(str).str.replace(r"\.", "", regex=True)  # Remove pontos (milhar)
-df_operacional["qtd_atividade"] = df_operacional["qtd_atividade"].str.replace(",", ".", regex=True)  # Converte vírgula para ponto decimal
-df_operacional["qtd_atividade"] = pd.to_numeric(df_operacional["qtd_atividade"], errors="coerce")  # Converte para float
-df_operacional["qtd_atividade_bin"] = (df_operacional["qtd_atividade"] > 0).astype(int)
+df_operacional = criar_variavel_alvo(df_operacional)
 
 # 📌 5️⃣ Salvar base final fusionada
 print("💾 Salvando base processada em `base_fusionada.csv`...")
 df_operacional.to_csv("base_fusionada.csv", index=False, sep=";")
 
+# 📌 6️⃣ Salvar cópia colunar particionada por ano/mês para os scripts 3.x
+print(f"💾 Salvando base colunar em `{CAMINHO_PARQUET_FUSIONADA}/`...")
+salvar_base_fusionada_parquet(df_operacional, substituir_tudo=True)
+
 print(f"✅ Processamento concluído! A base fusionada contém {df_operacional.shape[0]} registros e {df_operacional.shape[1]} colunas.")
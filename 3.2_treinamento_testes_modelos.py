@@ -11,15 +11,10 @@ from xgboost import XGBClassifier
 from lightgbm import LGBMClassifier
 from sklearn.neural_network import MLPClassifier
 from sklearn.metrics import accuracy_score, confusion_matrix
-from imblearn.over_sampling import SMOTE
+from reamostragem import criar_smote
+from base_colunar import carregar_base_fusionada
 
-# 📌 1️⃣ Carregar base de dados já fusionada
-print("📂 Carregando `base_fusionada.csv`...")
-df = pd.read_csv("base_fusionada.csv", delimiter=";", encoding="utf-8")
-
-print(f"✅ Base carregada com {df.shape[0]} registros e {df.shape[1]} colunas.")
-
-# 📌 2️⃣ Seleção de variáveis
+# 📌 1️⃣ Seleção de variáveis
 features = [
     "PRECIPITAÇÃO TOTAL, HORÁRIO (mm)",  
     "TEMPERATURA DO AR - BULBO SECO, HORARIA (°C)",  
@@ -29,6 +24,12 @@ features = [
 ]
 target = "qtd_atividade_bin"
 
+# 📌 2️⃣ Carregar apenas as colunas usadas da base já fusionada
+print("📂 Carregando base fusionada...")
+df = carregar_base_fusionada(colunas=features + [target])
+
+print(f"✅ Base carregada com {df.shape[0]} registros e {df.shape[1]} colunas.")
+
 # 🏗️ 3️⃣ Tratamento de valores ausentes (Preenchendo com a média)
 print("🔄 Tratando valores ausentes...")
 
@@ -44,7 +45,7 @@ X_train, X_test, y_train, y_test = train_test_split(df[features], df[target], te
 
 # 📊 6️⃣ Aplicação de SMOTE para balanceamento
 print("🔄 Aplicando SMOTE para balanceamento da base...")
-smote = SMOTE(random_state=42)
+smote = criar_smote(random_state=42)
 X_train_res, y_train_res = smote.fit_resample(X_train, y_train)
 
 print(f"✅ Base balanceada: {X_train_res.shape[0]} registros após SMOTE.")
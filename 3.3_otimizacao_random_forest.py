@@ -1,3 +1,4 @@
+import argparse
 import pandas as pd
 import numpy as np
 import seaborn as sns
@@ -6,11 +7,14 @@ from sklearn.model_selection import train_test_split, GridSearchCV
 from sklearn.preprocessing import StandardScaler
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
+from base_colunar import carregar_base_fusionada
+from busca_hiperparametros import busca_por_halving
 
-# 📂 Carregar base já processada
-print("📂 Carregando `base_fusionada.csv`...")
-df = pd.read_csv("base_fusionada.csv", delimiter=";", encoding="utf-8")
-print(f"✅ Base carregada com {df.shape[0]} registros e {df.shape[1]} colunas.")
+# ⚙️ Modo de busca: successive halving (padrão, retomável) ou a grade exaustiva original
+parser = argparse.ArgumentParser(description="Otimização dos hiperparâmetros do Random Forest.")
+parser.add_argument("--modo", choices=["halving", "grade"], default="halving", help="Estratégia de busca.")
+parser.add_argument("--fator", type=int, default=3, help="Fração de configurações eliminada a cada rodada do halving.")
+args = parser.parse_args()
 
 # 📊 Seleção de Variáveis
 features = [
@@ -21,6 +25,11 @@ features = [
 ]
 target = "qtd_atividade_bin"
 
+# 📂 Carregar apenas as colunas usadas da base já processada
+print("📂 Carregando base fusionada...")
+df = carregar_base_fusionada(colunas=features + [target])
+print(f"✅ Base carregada com {df.shape[0]} registros e {df.shape[1]} colunas.")
+
 # 🚨 Remover valores ausentes antes do treinamento
 df = df.dropna(subset=features + [target])
 
@@ -42,12 +51,18 @@ param_grid = {
     'min_samples_leaf': [1, 2, 4]
 }
 
-grid_search = GridSearchCV(RandomForestClassifier(random_state=42), param_grid, cv=3, n_jobs=-1, verbose=2)
-grid_search.fit(X_train, y_train)
+if args.modo == "grade":
+    grid_search = GridSearchCV(RandomForestClassifier(random_state=42), param_grid, cv=3, n_jobs=-1, verbose=2)
+    grid_search.fit(X_train, y_train)
+    best_params, best_model = grid_search.best_params_, grid_search.best_estimator_
+else:
+    best_params, best_model, historico = busca_por_halving(
+        RandomForestClassifier(random_state=42), param_grid, X_train, y_train.to_numpy(), fator=args.fator, cv=3
+    )
+    print(historico.sort_values(["rodada", "score"], ascending=[True, False]).groupby("rodada").head(3))
 
 # 🚀 Melhor Modelo
-best_model = grid_search.best_estimator_
-print(f"✅ Melhor Modelo: {grid_search.best_params_}")
+print(f"✅ Melhor Modelo: {best_params}")
 
 # 📊 Avaliação do modelo otimizado
 y_pred = best_model.predict(X_test)
@@ -6,15 +6,11 @@ from sklearn.model_selection import train_test_split, GridSearchCV
 from sklearn.preprocessing import StandardScaler
 from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
 from xgboost import XGBClassifier
-from imblearn.over_sampling import SMOTE
+from reamostragem import criar_smote
 from imblearn.under_sampling import RandomUnderSampler
 from sklearn.utils.class_weight import compute_class_weight
 from sklearn.metrics import classification_report, confusion_matrix
-
-# 📂 Carregar os dados fusionados
-print("📂 Carregando `base_fusionada.csv`...")
-df = pd.read_csv("base_fusionada.csv", delimiter=";", encoding="utf-8")
-print(f"✅ Base carregada com {df.shape[0]} registros e {df.shape[1]} colunas.")
+from base_colunar import carregar_base_fusionada
 
 # 📊 Seleção de Features (adicionando novas variáveis)
 features = [
@@ -27,6 +23,11 @@ features = [
 ]
 target = "qtd_atividade_bin"
 
+# 📂 Carregar apenas as colunas usadas dos dados fusionados
+print("📂 Carregando base fusionada...")
+df = carregar_base_fusionada(colunas=features + [target])
+print(f"✅ Base carregada com {df.shape[0]} registros e {df.shape[1]} colunas.")
+
 # 🚨 Verificar valores ausentes
 df.dropna(subset=features + [target], inplace=True)
 print(f"✅ Após remoção de valores ausentes, restam {df.shape[0]} registros.")
@@ -36,7 +37,7 @@ X_train, X_test, y_train, y_test = train_test_split(df[features], df[target], te
 
 # 🔄 Balanceamento de Classes
 print("🔄 Aplicando SMOTE e undersampling para balanceamento...")
-smote = SMOTE(sampling_strategy=0.5, random_state=42)
+smote = criar_smote(sampling_strategy=0.5, random_state=42)
 under_sampler = RandomUnderSampler(sampling_strategy=0.5, random_state=42)
 X_train_res, y_train_res = smote.fit_resample(X_train, y_train)
 X_train_res, y_train_res = under_sampler.fit_resample(X_train_res, y_train_res)
@@ -6,19 +6,10 @@ from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import classification_report, confusion_matrix, accuracy_score
-from imblearn.over_sampling import SMOTE
+from reamostragem import criar_smote
 from imblearn.under_sampling import RandomUnderSampler
 from imblearn.pipeline import Pipeline
-
-# 📂 Carregar base de dados
-print("📂 Carregando `base_fusionada.csv`...")
-df = pd.read_csv("base_fusionada.csv", delimiter=";", encoding="utf-8")
-print(f"✅ Base carregada com {df.shape[0]} registros e {df.shape[1]} colunas.")
-
-# 🔄 Remover valores ausentes
-print("✅ Removendo valores ausentes...")
-df.dropna(inplace=True)
-print(f"✅ Após remoção de valores ausentes, restam {df.shape[0]} registros.")
+from base_colunar import carregar_linhas_completas
 
 # 📌 Definir Features e Target
 features = [
@@ -29,12 +20,18 @@ features = [
 ]
 target = "qtd_atividade_bin"
 
+# 📂 Carregar as colunas usadas, apenas das linhas sem valores ausentes
+# O critério é o da base inteira (como o `dropna()` original), mas só as colunas usadas ficam em memória
+print("📂 Carregando base fusionada (linhas completas)...")
+df = carregar_linhas_completas(features + [target])
+print(f"✅ Após remoção de valores ausentes, restam {df.shape[0]} registros.")
+
 # ✂️ Separação Treino/Teste
 X_train, X_test, y_train, y_test = train_test_split(df[features], df[target], test_size=0.2, stratify=df[target], random_state=42)
 
 # 🔄 Aplicando SMOTE + Undersampling
 print("🔄 Aplicando SMOTE e undersampling para balanceamento...")
-over_sampler = SMOTE(sampling_strategy=0.5, random_state=42)  # Aumenta a classe minoritária até 50% da majoritária
+over_sampler = criar_smote(sampling_strategy=0.5, random_state=42)  # Aumenta a classe minoritária até 50% da majoritária
 under_sampler = RandomUnderSampler(sampling_strategy=0.8, random_state=42)  # Reduz a classe majoritária
 pipeline = Pipeline(steps=[('o', over_sampler), ('u', under_sampler)])
 X_train_res, y_train_res = pipeline.fit_resample(X_train, y_train)
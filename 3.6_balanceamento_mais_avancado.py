@@ -1,3 +1,4 @@
+import argparse
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
@@ -5,19 +6,21 @@ import seaborn as sns
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
 from sklearn.ensemble import RandomForestClassifier
-from imblearn.combine import SMOTETomek, SMOTEENN
+from reamostragem import criar_smote_tomek
 from sklearn.metrics import accuracy_score, classification_report, confusion_matrix, roc_auc_score, balanced_accuracy_score
-from joblib import dump
+from pacote_inferencia import salvar_pacote, CAMINHO_PACOTE
+from base_colunar import carregar_linhas_completas, iterar_base_fusionada
+from amostragem_estratificada import amostra_reservatorio_estratificada
+from monitoramento import medir_etapa
 
-# 📂 Carregar base de dados
-print("\n📂 Carregando `base_fusionada.csv`...")
-df = pd.read_csv("base_fusionada.csv", delimiter=";", encoding="utf-8")
-print(f"✅ Base carregada com {df.shape[0]} registros e {df.shape[1]} colunas.")
-
-# 🔄 Remover valores ausentes
-print("✅ Removendo valores ausentes...")
-df.dropna(inplace=True)
-print(f"✅ Após remoção de valores ausentes, restam {df.shape[0]} registros.")
+# ⚙️ Modo de treinamento: base completa (original) ou amostra estratificada com memória limitada
+parser = argparse.ArgumentParser(description="Treinamento do Random Forest com balanceamento SMOTETomek.")
+parser.add_argument("--modo", choices=["completo", "amostrado"], default="completo", help="Base completa ou amostra estratificada.")
+parser.add_argument("--tamanho-amostra", type=int, default=500_000, help="Linhas da amostra estratificada (modo amostrado).")
+parser.add_argument("--tamanho-lote", type=int, default=500_000, help="Linhas por lote de leitura (modo amostrado).")
+parser.add_argument("--n-jobs", type=int, default=-1, help="Processos para a construção das árvores.")
+args = parser.parse_args()
+etapas = []
 
 # 📊 Seleção de Variáveis
 features = [
@@ -28,6 +31,22 @@ features = [
 ]
 target = "qtd_atividade_bin"
 
+if args.modo == "completo":
+    # 📂 Carregar as colunas usadas, apenas das linhas sem valores ausentes
+    # O critério é o da base inteira (como o `dropna()` original), mas só as colunas usadas ficam em memória
+    print("\n📂 Carregando base fusionada (linhas completas)...")
+    with medir_etapa("Carregamento", etapas):
+        df = carregar_linhas_completas(features + [target], tamanho_lote=args.tamanho_lote)
+    print(f"✅ Após remoção de valores ausentes, restam {df.shape[0]} registros.")
+else:
+    # 📂 Ler a base em lotes mantendo só uma amostra estratificada (reservatório) de cada classe
+    print(f"\n📂 Amostrando {args.tamanho_amostra} registros da base fusionada em lotes de {args.tamanho_lote}...")
+    with medir_etapa("Amostragem estratificada", etapas):
+        lotes = iterar_base_fusionada(features + [target], tamanho_lote=args.tamanho_lote)
+        df, contagem = amostra_reservatorio_estratificada(lotes, target, args.tamanho_amostra, random_state=42)
+    print(f"✅ Registros válidos por classe na base: {contagem}")
+    print(f"✅ Amostra com {df.shape[0]} registros: {df[target].value_counts().to_dict()}")
+
 X = df[features]
 y = df[target]
 
@@ -36,25 +55,25 @@ X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, stratif
 print(f"✅ Base separada: {X_train.shape[0]} treino / {X_test.shape[0]} teste")
 
 # 🔄 Normalização
-target_scaler = StandardScaler()
-X_train = target_scaler.fit_transform(X_train)
-X_test = target_scaler.transform(X_test)
+with medir_etapa("Normalização", etapas):
+    target_scaler = StandardScaler()
+    X_train = target_scaler.fit_transform(X_train)
+    X_test = target_scaler.transform(X_test)
 
 # 🔄 Aplicação de Técnicas de Balanceamento Avançadas
 print("🔄 Aplicando SMOTETomek para balanceamento avançado...")
-smote_tomek = SMOTETomek(random_state=42)
-X_train_res, y_train_res = smote_tomek.fit_resample(X_train, y_train)
+with medir_etapa("SMOTETomek", etapas):
+    smote_tomek = criar_smote_tomek(random_state=42, n_jobs=args.n_jobs)
+    X_train_res, y_train_res = smote_tomek.fit_resample(X_train, y_train)
 print(f"✅ Base balanceada com SMOTETomek: {X_train_res.shape[0]} registros")
 
 # 🚀 Treinar o Modelo Random Forest
 print("\n🚀 Treinando Modelo: Random Forest")
-modelo_rf = RandomForestClassifier(n_estimators=100, random_state=42)
-modelo_rf.fit(X_train_res, y_train_res)
-y_pred = modelo_rf.predict(X_test)
-
-# 📥 Salvando o modelo treinado para uso posterior
-dump(modelo_rf, "modelo_random_forest.joblib")
-print("✅ Modelo Random Forest salvo como `modelo_random_forest.joblib`!")
+with medir_etapa("Treinamento do Random Forest", etapas):
+    modelo_rf = RandomForestClassifier(n_estimators=100, random_state=42, n_jobs=args.n_jobs)
+    modelo_rf.fit(X_train_res, y_train_res)
+with medir_etapa("Predição no teste", etapas):
+    y_pred = modelo_rf.predict(X_test)
 
 # 📊 Avaliação do Modelo
 acc = accuracy_score(y_test, y_pred)
@@ -68,6 +87,12 @@ print(confusion_matrix(y_test, y_pred))
 print("\n📊 Relatório de Classificação:")
 print(classification_report(y_test, y_pred))
 
+# 📥 Salvando scaler + modelo + features em um único pacote de inferência
+with medir_etapa("Gravação do pacote de inferência", etapas):
+    salvar_pacote(modelo_rf, target_scaler, features, X.dtypes,
+                  metricas={"acuracia": acc, "balanced_accuracy": bal_acc, "auc_roc": roc_auc, "modo": args.modo})
+print(f"✅ Pacote de inferência salvo como `{CAMINHO_PACOTE}`!")
+
 # 📊 Plotando a Comparação
 resultados = pd.DataFrame({"Métrica": ["Acurácia", "Balanced Accuracy", "AUC-ROC"],
                            "Valor": [acc, bal_acc, roc_auc]})
@@ -77,4 +102,7 @@ plt.title("Comparação de Métricas do Modelo")
 plt.ylim(0, 1)
 plt.show()
 
+print("\n⏱️ Resumo de tempo e memória por etapa:")
+print(pd.DataFrame(etapas).to_string(index=False))
+
 print("✅ Ajustes concluídos! O modelo está pronto para análise final.")
@@ -3,17 +3,16 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
-from joblib import load
+from base_colunar import carregar_base_fusionada
+from pacote_inferencia import carregar_pacote, prever
 
-# ✨ Carregar o modelo treinado e o scaler
+# ✨ Carregar o pacote de inferência (scaler + modelo do mesmo treinamento)
 print("\U0001F4E5 Carregando modelo treinado...")
-modelo = load("modelo_random_forest.joblib")  # Certifique-se de que o modelo treinado está salvo corretamente
-scaler = load("scaler.joblib")  # Carregar o normalizador usado no treinamento
+pacote = carregar_pacote()
 
 # ✨ Criar subconjunto de dados diretamente da base original, sem depender de um CSV externo
+# (para pontuar a base inteira ou novos arquivos mensais, use `python pontuacao_lote.py`)
 print("\U0001F4C2 Criando subconjunto de dados para previsão...")
-df_base = pd.read_csv("base_fusionada.csv", delimiter=";", encoding="utf-8")
-
 features = [
     "PRECIPITAÇÃO TOTAL, HORÁRIO (mm)",
     "TEMPERATURA DO AR - BULBO SECO, HORARIA (°C)",
@@ -22,22 +21,23 @@ features = [
     "valor_unitario"  # Adicionando a coluna necessária
 ]
 
-df_novo = df_base[df_base["qtd_atividade"] > 0].sample(n=100, random_state=42)
+# O filtro `qtd_atividade > 0` é aplicado na leitura (predicate pushdown)
+df_base = carregar_base_fusionada(
+    colunas=["data_servico", "qtd_atividade"] + features,
+    filtros=[("qtd_atividade", ">", 0)]
+)
+
+# A ordem das linhas lidas do Parquet depende da ordem dos arquivos/fragmentos; ordenar por todas
+# as colunas antes de sortear deixa a amostra reproduzível entre execuções
+df_base = df_base.sort_values(by=list(df_base.columns), kind="mergesort", ignore_index=True)
+df_novo = df_base.sample(n=100, random_state=42)
 
 # ✨ Remover valores ausentes antes da normalização
 df_novo.dropna(subset=["PRECIPITAÇÃO TOTAL, HORÁRIO (mm)", "valor_unitario"], inplace=True)
 print(f"✅ Subconjunto criado com {df_novo.shape[0]} registros.")
 
-# ✨ Normalizar os dados
-X_novo = scaler.transform(df_novo[[
-    "PRECIPITAÇÃO TOTAL, HORÁRIO (mm)",
-    "TEMPERATURA DO AR - BULBO SECO, HORARIA (°C)",
-    "UMIDADE RELATIVA DO AR, HORARIA (%)",
-    "VENTO, VELOCIDADE HORARIA (m/s)"
-]])
-
-# ✨ Realizar previsões
-df_novo["Previsao_Ocorrencia"] = modelo.predict(X_novo)
+# ✨ Normalizar os dados e realizar previsões
+df_novo["Previsao_Ocorrencia"] = prever(pacote, df_novo)
 
 df_novo["Custo_Estimado"] = df_novo["Previsao_Ocorrencia"] * df_novo["valor_unitario"]
 
@@ -2,12 +2,11 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
-from joblib import load
+from pacote_inferencia import carregar_pacote, prever
 
 # 📌 1️⃣ Carregar o modelo treinado e os dados para previsão
 print("📥 Carregando modelo treinado...")
-modelo = load("modelo_random_forest.joblib")  # Certifique-se de que o modelo treinado está salvo corretamente
-scaler = load("scaler.joblib")  # Carregar o normalizador usado no treinamento
+pacote = carregar_pacote()  # Scaler e modelo gravados juntos pelo script 3.6
 
 # 📂 2️⃣ Criar um subconjunto para previsão (se necessário)
 meses = ["Jan", "Fev", "Mar", "Abr", "Mai", "Jun", "Jul", "Ago", "Set", "Out", "Nov", "Dez"]
@@ -25,13 +24,9 @@ df_previsao = pd.DataFrame({
 
 print(f"✅ Base de previsão criada com {df_previsao.shape[0]} registros.")
 
-# 📌 3️⃣ Aplicar a normalização (opcional)
-print("🔄 Normalizando os dados...")
-X_previsao = scaler.transform(df_previsao.iloc[:, 1:5])
-
-# 📌 4️⃣ Realizar previsões
-print("🔮 Gerando previsões...")
-df_previsao["Previsao_Ocorrencia"] = modelo.predict(X_previsao)
+# 📌 3️⃣ e 4️⃣ Aplicar a normalização do treinamento e realizar previsões
+print("🔮 Normalizando os dados e gerando previsões...")
+df_previsao["Previsao_Ocorrencia"] = prever(pacote, df_previsao)
 
 # 📌 5️⃣ Ajuste para evitar meses com zero ocorrências
 media_ocorrencias = 10  # Ajuste para uma média histórica mínima mais realista
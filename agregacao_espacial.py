@@ -0,0 +1,78 @@
+"""Agregação espacial das ocorrências em grade para os mapas de calor (2.4 e 2.5).
+
+Em vez de enviar ao folium uma coordenada por ocorrência, as ocorrências são
+contadas em células de uma grade regular (histograma 2D esparso, apenas das
+células ocupadas, com `np.unique`) e o mapa recebe somente essas células, com
+peso proporcional à contagem. Como só as células ocupadas são alocadas, uma
+coordenada isolada muito distante não faz a grade crescer até a caixa
+envolvente inteira.
+O tamanho da célula é derivado do nível de zoom máximo do mapa de calor
+(`tamanho_celula_para_zoom`), de modo que, nesse zoom, cada célula ocupa
+poucos pixels e o resultado visual é equivalente ao dos pontos individuais.
+Os mapas usam uma única grade, a do zoom máximo, em todos os níveis de zoom:
+nos zooms menores o próprio Leaflet.heat agrupa os pontos pelo raio em
+pixels, de modo que grades mais grossas por faixa de zoom só reduziriam um
+HTML que já é pequeno.
+"""
+import numpy as np
+import pandas as pd
+
+# Lado da célula, em pixels, no zoom máximo do mapa de calor
+PIXELS_POR_CELULA = 4
+QUANTIL_SATURACAO = 0.99
+
+
+def tamanho_celula_para_zoom(zoom, pixels_por_celula=PIXELS_POR_CELULA):
+    """Lado da célula (graus) equivalente a `pixels_por_celula` pixels no `zoom` do mapa (tiles de 256 px)."""
+    return 360 / (256 * 2 ** zoom) * pixels_por_celula
+
+
+def agregar_em_grade(latitude, longitude, tamanho_celula, pesos=None):
+    """Conta (ou soma `pesos`) das ocorrências em cada célula da grade.
+
+    Retorna um DataFrame com uma linha por célula ocupada: `latitude` e
+    `longitude` do centro da célula, `contagem` e `peso` em (0, 1], com a
+    saturação no quantil 99 das contagens para que poucas células muito
+    densas não apaguem o restante do mapa.
+    """
+    latitude = np.asarray(latitude, dtype=np.float64)
+    longitude = np.asarray(longitude, dtype=np.float64)
+    # Coordenadas fora do globo (ex.: sem o separador decimal) são descartadas
+    validas = (np.abs(latitude) <= 90) & (np.abs(longitude) <= 180)
+    latitude, longitude = latitude[validas], longitude[validas]
+    if pesos is not None:
+        pesos = np.asarray(pesos, dtype=np.float64)[validas]
+    if latitude.size == 0:
+        return pd.DataFrame(columns=["latitude", "longitude", "contagem", "peso"])
+
+    # Origem da grade alinhada a múltiplos do tamanho da célula, para que as células sejam as mesmas entre execuções
+    origem_lat = np.floor(latitude.min() / tamanho_celula) * tamanho_celula
+    origem_lon = np.floor(longitude.min() / tamanho_celula) * tamanho_celula
+    linha = ((latitude - origem_lat) // tamanho_celula).astype(np.int64)
+    coluna = ((longitude - origem_lon) // tamanho_celula).astype(np.int64)
+    n_colunas = coluna.max() + 1
+
+    ocupadas, inverso = np.unique(linha * n_colunas + coluna, return_inverse=True)
+    contagem = np.bincount(inverso.ravel(), weights=pesos, minlength=len(ocupadas))
+    saturacao = np.quantile(contagem, QUANTIL_SATURACAO)
+
+    return pd.DataFrame({
+        "latitude": origem_lat + (ocupadas // n_colunas + 0.5) * tamanho_celula,
+        "longitude": origem_lon + (ocupadas % n_colunas + 0.5) * tamanho_celula,
+        "contagem": contagem,
+        "peso": np.minimum(contagem / saturacao, 1.0),
+    })
+
+
+def agregar_por_grupo(df, coluna_grupo, tamanho_celula, latitude="latitude", longitude="longitude"):
+    """Grade de cada valor de `coluna_grupo` (ex.: mês ou município), concatenadas com a coluna do grupo."""
+    partes = []
+    for grupo, dados in df.groupby(coluna_grupo, observed=True, sort=True):
+        celulas = agregar_em_grade(dados[latitude], dados[longitude], tamanho_celula)
+        partes.append(celulas.assign(**{coluna_grupo: grupo}))
+    return pd.concat(partes, ignore_index=True) if partes else pd.DataFrame()
+
+
+def pontos_mapa_calor(celulas):
+    """Lista [lat, lon, peso] no formato do `folium.plugins.HeatMap`."""
+    return celulas[["latitude", "longitude", "peso"]].to_numpy().round(6).tolist()
@@ -0,0 +1,48 @@
+"""Amostragem estratificada por reservatório sobre a base lida em lotes.
+
+Cada linha recebe uma prioridade aleatória uniforme e, para cada classe do
+alvo, o reservatório guarda apenas as `tamanho_amostra` linhas de menor
+prioridade vistas até o momento. O resultado é uma amostra uniforme de cada
+classe, com memória limitada a `tamanho_amostra` linhas por classe,
+independentemente do tamanho da base. Ao final, as classes são reduzidas às
+suas proporções originais na base (estratificação proporcional).
+"""
+import numpy as np
+import pandas as pd
+
+COLUNA_PRIORIDADE = '_prioridade'
+
+
+def amostra_reservatorio_estratificada(lotes, alvo, tamanho_amostra, subset=None, random_state=42):
+    """Amostra estratificada de `tamanho_amostra` linhas a partir de um iterável de DataFrames.
+
+    Linhas com valores ausentes em `subset` (padrão: todas as colunas) são
+    descartadas antes da amostragem. Retorna `(amostra, contagem_por_classe)`,
+    onde a contagem se refere a todas as linhas válidas vistas.
+    """
+    rng = np.random.default_rng(random_state)
+    reservatorios = {}
+    contagem = {}
+
+    for lote in lotes:
+        lote = lote.dropna(subset=subset)
+        if lote.empty:
+            continue
+        lote = lote.assign(**{COLUNA_PRIORIDADE: rng.random(len(lote))})
+        for classe, grupo in lote.groupby(alvo, sort=False, observed=True):
+            contagem[classe] = contagem.get(classe, 0) + len(grupo)
+            atual = reservatorios.get(classe)
+            candidatos = grupo if atual is None else pd.concat([atual, grupo], ignore_index=True)
+            reservatorios[classe] = candidatos.nsmallest(tamanho_amostra, COLUNA_PRIORIDADE)
+
+    total = sum(contagem.values())
+    partes = []
+    for classe, reservatorio in reservatorios.items():
+        # As menores prioridades de uma amostra uniforme continuam sendo uma amostra uniforme
+        cota = max(1, round(tamanho_amostra * contagem[classe] / total))
+        partes.append(reservatorio.nsmallest(cota, COLUNA_PRIORIDADE))
+
+    if not partes:
+        raise ValueError("Nenhuma linha válida encontrada para amostragem.")
+    amostra = pd.concat(partes, ignore_index=True).sort_values(COLUNA_PRIORIDADE)
+    return amostra.drop(columns=COLUNA_PRIORIDADE).reset_index(drop=True), contagem
@@ -0,0 +1,138 @@
+"""Acesso colunar à base fusionada.
+
+O script 3.1 grava a base fusionada uma única vez em Parquet particionado por
+ano/mês de `data_servico`. Os scripts 3.x leem apenas as colunas de que
+precisam (projeção de colunas) e podem filtrar partições/linhas antes de
+carregar os dados em memória (predicate pushdown).
+"""
+import os
+import shutil
+
+import pandas as pd
+
+from esquema_bases import aplicar_esquema, ler_base
+
+CAMINHO_CSV_FUSIONADA = "base_fusionada.csv"
+CAMINHO_PARQUET_FUSIONADA = "base_fusionada_parquet"
+COLUNAS_PARTICAO = ["ano", "mes"]
+# Colunas que não entram no critério de linha completa: as de partição (derivadas de `data_servico`)
+# e as acrescentadas depois da base fusionada original (o município IBGE é nulo fora dos polígonos)
+COLUNAS_FORA_DA_COMPLETUDE = COLUNAS_PARTICAO + ["municipio"]
+
+
+def salvar_base_fusionada_parquet(df, caminho=CAMINHO_PARQUET_FUSIONADA, substituir_tudo=False):
+    """Grava a base fusionada em Parquet particionado por ano/mês de `data_servico`, com os tipos do esquema.
+
+    Por padrão só as partições presentes em `df` são substituídas (ingestão incremental). Com
+    `substituir_tudo=True` (reconstrução completa no 3.1) o diretório é apagado antes, para que não
+    sobrem partições `ano=/mes=` de meses que saíram da base.
+    """
+    # Cópia rasa: cada coluna convertida é substituída só nesta cópia, sem duplicar a base inteira em memória
+    df = aplicar_esquema(df.copy(deep=False), "fusionada")
+    data_servico = df["data_servico"]
+    df["ano"] = data_servico.dt.year.astype("Int16")
+    df["mes"] = data_servico.dt.month.astype("Int8")
+
+    # Colunas de texto com valores mistos não são aceitas pelo Arrow
+    for coluna in df.columns[df.dtypes == object]:
+        df[coluna] = df[coluna].astype("string")
+
+    if substituir_tudo and os.path.isdir(caminho):
+        shutil.rmtree(caminho)
+    df.to_parquet(
+        caminho,
+        engine="pyarrow",
+        index=False,
+        partition_cols=COLUNAS_PARTICAO,
+        existing_data_behavior="delete_matching",
+    )
+    return caminho
+
+
+def carregar_base_fusionada(colunas=None, filtros=None, caminho=CAMINHO_PARQUET_FUSIONADA):
+    """Carrega somente as `colunas` pedidas da base fusionada.
+
+    `filtros` segue a sintaxe do pyarrow, por exemplo
+    `[("ano", ">=", 2023), ("qtd_atividade", ">", 0)]`. Filtros sobre as
+    colunas de partição descartam diretórios inteiros sem lê-los.
+    Caso o Parquet ainda não exista, recorre ao CSV lendo apenas as colunas
+    pedidas e aplicando os filtros em memória.
+    """
+    if os.path.isdir(caminho):
+        df = pd.read_parquet(caminho, engine="pyarrow", columns=colunas, filters=filtros)
+        for coluna in COLUNAS_PARTICAO:
+            if coluna in df.columns and (colunas is None or coluna not in colunas):
+                df = df.drop(columns=coluna)
+        return df
+
+    print(f"⚠️ `{caminho}` não encontrado, lendo `{CAMINHO_CSV_FUSIONADA}`...")
+    colunas_filtro = [coluna for coluna, _, _ in (filtros or [])]
+    usa_particao = any(coluna in COLUNAS_PARTICAO for coluna in colunas_filtro + list(colunas or []))
+    colunas_csv = [coluna for coluna in colunas_filtro + list(colunas or []) if coluna not in COLUNAS_PARTICAO]
+    if usa_particao:
+        colunas_csv.append("data_servico")
+    usecols = None if colunas is None else list(dict.fromkeys(colunas_csv))
+    df = ler_base(CAMINHO_CSV_FUSIONADA, "fusionada", usecols=usecols)
+    if usa_particao:
+        data_servico = df["data_servico"]
+        df["ano"] = data_servico.dt.year
+        df["mes"] = data_servico.dt.month
+    df = _aplicar_filtros(df, filtros)
+    if colunas is not None:
+        df = df[list(colunas)]
+    return df.reset_index(drop=True)
+
+
+def iterar_base_fusionada(colunas, tamanho_lote=500_000, caminho=CAMINHO_PARQUET_FUSIONADA):
+    """Percorre a base fusionada em lotes de até `tamanho_lote` linhas, lendo apenas as `colunas` (None = todas).
+
+    A memória usada é limitada pelo tamanho do lote, e não pelo tamanho da base.
+    """
+    colunas = None if colunas is None else list(colunas)
+    if os.path.isdir(caminho):
+        import pyarrow.dataset as ds
+
+        dataset = ds.dataset(caminho, format="parquet", partitioning="hive")
+        for lote in dataset.to_batches(columns=colunas, batch_size=tamanho_lote):
+            yield lote.to_pandas()
+        return
+
+    print(f"⚠️ `{caminho}` não encontrado, lendo `{CAMINHO_CSV_FUSIONADA}` em blocos...")
+    blocos = pd.read_csv(CAMINHO_CSV_FUSIONADA, delimiter=";", encoding="utf-8", usecols=colunas, chunksize=tamanho_lote)
+    for bloco in blocos:
+        yield aplicar_esquema(bloco, "fusionada")
+
+
+def carregar_linhas_completas(colunas, tamanho_lote=500_000, caminho=CAMINHO_PARQUET_FUSIONADA):
+    """Carrega as `colunas` apenas das linhas sem valores ausentes em toda a base (o `dropna()` da base inteira).
+
+    O critério considera todas as colunas da base (exceto COLUNAS_FORA_DA_COMPLETUDE),
+    mas a base é percorrida em lotes e só as `colunas` pedidas das linhas
+    completas ficam em memória.
+    """
+    colunas = list(colunas)
+    partes = []
+    for lote in iterar_base_fusionada(None, tamanho_lote, caminho):
+        criterio = lote.drop(columns=[coluna for coluna in COLUNAS_FORA_DA_COMPLETUDE if coluna in lote.columns])
+        partes.append(lote.loc[criterio.notna().all(axis=1).to_numpy(), colunas])
+    if not partes:
+        return pd.DataFrame(columns=colunas)
+    # Categorias que diferem entre lotes viram object na concatenação; o esquema as restaura
+    return aplicar_esquema(pd.concat(partes, ignore_index=True), "fusionada")
+
+
+def _aplicar_filtros(df, filtros):
+    operadores = {
+        "=": lambda s, v: s == v,
+        "==": lambda s, v: s == v,
+        "!=": lambda s, v: s != v,
+        ">": lambda s, v: s > v,
+        ">=": lambda s, v: s >= v,
+        "<": lambda s, v: s < v,
+        "<=": lambda s, v: s <= v,
+        "in": lambda s, v: s.isin(v),
+        "not in": lambda s, v: ~s.isin(v),
+    }
+    for coluna, operador, valor in filtros or []:
+        df = df[operadores[operador](df[coluna], valor)]
+    return df
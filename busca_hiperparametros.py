@@ -0,0 +1,128 @@
+"""Busca de hiperparâmetros por successive halving, com checkpoint e retomada.
+
+Todas as configurações da grade começam avaliadas (validação cruzada) em uma
+subamostra estratificada pequena do treino; a cada rodada só a melhor fração
+`1/fator` das configurações segue adiante, avaliada em uma subamostra `fator`
+vezes maior, até restar uma configuração ou a subamostra atingir o treino
+inteiro. Com 81 configurações e fator 3 são 4 rodadas (81 → 27 → 9 → 3), e só
+a última usa a base toda.
+
+Cada avaliação concluída é acrescentada a um arquivo JSON Lines. Se a busca for
+interrompida, a próxima execução com os mesmos dados e a mesma grade reaproveita
+as avaliações gravadas e continua de onde parou.
+"""
+import hashlib
+import json
+import math
+import os
+import time
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed, effective_n_jobs
+from sklearn.base import clone
+from sklearn.model_selection import ParameterGrid, StratifiedKFold, cross_val_score, train_test_split
+
+CAMINHO_CHECKPOINT = 'busca_hiperparametros.jsonl'
+
+
+def _identificar_busca(X, y, grade, fator, min_amostras, cv, scoring, random_state):
+    """Hash que identifica a busca; avaliações gravadas com outra identificação são ignoradas."""
+    h = hashlib.sha256()
+    h.update(pd.util.hash_pandas_object(pd.DataFrame(X), index=False).to_numpy().tobytes())
+    h.update(pd.util.hash_pandas_object(pd.Series(np.asarray(y)), index=False).to_numpy().tobytes())
+    h.update(json.dumps([grade, fator, min_amostras, cv, scoring, random_state], sort_keys=True, default=str).encode('utf-8'))
+    return h.hexdigest()[:16]
+
+
+def _chave(rodada, parametros):
+    return f'{rodada}|{json.dumps(parametros, sort_keys=True, default=str)}'
+
+
+def _ler_checkpoint(caminho, busca):
+    avaliacoes = {}
+    if not os.path.exists(caminho):
+        return avaliacoes
+    with open(caminho, encoding='utf-8') as arquivo:
+        for linha in arquivo:
+            try:
+                registro = json.loads(linha)
+            except json.JSONDecodeError:
+                continue  # linha truncada por uma interrupção durante a escrita
+            if registro.get('busca') == busca:
+                avaliacoes[_chave(registro['rodada'], registro['parametros'])] = registro
+    return avaliacoes
+
+
+def _avaliar(estimador, parametros, X, y, cv, scoring):
+    inicio = time.perf_counter()
+    modelo = clone(estimador).set_params(**parametros)
+    scores = cross_val_score(modelo, X, y, cv=cv, scoring=scoring, n_jobs=1)
+    return float(np.mean(scores)), time.perf_counter() - inicio
+
+
+def busca_por_halving(estimador, grade, X, y, fator=3, min_amostras=None, cv=3, scoring='accuracy',
+                      n_jobs=-1, random_state=42, caminho_checkpoint=CAMINHO_CHECKPOINT):
+    """Successive halving sobre `grade` (dicionário no formato do GridSearchCV).
+
+    `min_amostras` é o tamanho da subamostra da primeira rodada; por padrão é
+    escolhido para que a última rodada use todo o treino. Retorna
+    `(melhores_parametros, melhor_modelo, historico)`, com o melhor modelo
+    reajustado em todo `X` e o histórico de avaliações em um DataFrame.
+    """
+    X = np.asarray(X)
+    y = np.asarray(y)
+    candidatos = list(ParameterGrid(grade))
+    n_rodadas = max(1, math.ceil(math.log(len(candidatos), fator)))
+    if min_amostras is None:
+        min_amostras = max(cv * 2 * len(np.unique(y)), len(y) // fator ** (n_rodadas - 1))
+
+    busca = _identificar_busca(X, y, grade, fator, min_amostras, cv, scoring, random_state)
+    avaliacoes = _ler_checkpoint(caminho_checkpoint, busca)
+    if avaliacoes:
+        print(f"♻️ Retomando a busca: {len(avaliacoes)} avaliações recuperadas de `{caminho_checkpoint}`.")
+
+    divisor = StratifiedKFold(n_splits=cv, shuffle=True, random_state=random_state)
+    tamanho_lote = max(1, effective_n_jobs(n_jobs))
+    historico = []
+
+    with open(caminho_checkpoint, 'a', encoding='utf-8') as checkpoint:
+        for rodada in range(n_rodadas):
+            n_amostras = min(len(y), min_amostras * fator ** rodada)
+            if n_amostras < len(y):
+                indices, _ = train_test_split(np.arange(len(y)), train_size=n_amostras, stratify=y,
+                                              random_state=random_state + rodada)
+            else:
+                indices = np.arange(len(y))
+            X_rodada, y_rodada = X[indices], y[indices]
+
+            pendentes = [p for p in candidatos if _chave(rodada, p) not in avaliacoes]
+            print(f"🔁 Rodada {rodada + 1}/{n_rodadas}: {len(candidatos)} configurações em {n_amostras} amostras "
+                  f"({len(candidatos) - len(pendentes)} já avaliadas).")
+
+            # Lotes do tamanho do paralelismo, para gravar o checkpoint à medida que as avaliações terminam
+            for inicio in range(0, len(pendentes), tamanho_lote):
+                lote = pendentes[inicio:inicio + tamanho_lote]
+                resultados = Parallel(n_jobs=n_jobs)(
+                    delayed(_avaliar)(estimador, p, X_rodada, y_rodada, divisor, scoring) for p in lote
+                )
+                for parametros, (score, tempo) in zip(lote, resultados):
+                    registro = {'busca': busca, 'rodada': rodada, 'n_amostras': int(n_amostras),
+                                'parametros': parametros, 'score': score, 'tempo_s': round(tempo, 2)}
+                    avaliacoes[_chave(rodada, parametros)] = registro
+                    checkpoint.write(json.dumps(registro, default=str) + '\n')
+                checkpoint.flush()
+
+            ordenados = sorted(candidatos, key=lambda p: avaliacoes[_chave(rodada, p)]['score'], reverse=True)
+            historico.extend(avaliacoes[_chave(rodada, p)] for p in candidatos)
+            if len(candidatos) == 1 or n_amostras == len(y):
+                candidatos = ordenados[:1]
+                break
+            candidatos = ordenados[:max(1, math.ceil(len(candidatos) / fator))]
+
+    melhores_parametros = candidatos[0]
+    melhor_modelo = clone(estimador).set_params(**melhores_parametros).fit(X, y)
+
+    historico = pd.DataFrame(historico).drop(columns='busca')
+    print(f"⏱️ Tempo total de ajuste nas avaliações: {historico['tempo_s'].sum():.1f}s.")
+    return melhores_parametros, melhor_modelo, historico
@@ -0,0 +1,105 @@
+"""Camada de municípios de Goiás em cache: reprojetada, simplificada e com centroides.
+
+O shapefile original (SIRGAS 2000) é lido uma única vez, reprojetado para
+WGS84 (EPSG:4326, usado pelo folium), simplificado preservando as fronteiras
+compartilhadas entre municípios e gravado em GeoParquet em `cache_geo/`,
+junto com os centroides calculados em uma projeção métrica (e não em graus).
+O cache é refeito automaticamente quando o shapefile ou a tolerância mudam.
+"""
+import glob
+import hashlib
+import json
+import os
+
+import geopandas as gpd
+import numpy as np
+import shapely
+
+CAMINHO_SHAPEFILE = "shapefile/goias_shapefile.shp"
+PASTA_CACHE = "cache_geo"
+
+CRS_ORIGINAL = 4674  # SIRGAS 2000
+CRS_MAPA = 4326  # WGS84
+CRS_METRICO = 5880  # SIRGAS 2000 / Brazil Polyconic, para os centroides
+
+TOLERANCIA_SIMPLIFICACAO = 0.001  # graus (~100 m), imperceptível no zoom dos mapas
+CASAS_DECIMAIS = 5  # ~1 m
+
+
+def caminho_camada(tolerancia=TOLERANCIA_SIMPLIFICACAO):
+    """Arquivo do cache para a `tolerancia` dada (0 = geometria original, sem simplificação)."""
+    return os.path.join(PASTA_CACHE, f"goias_municipios_{tolerancia:g}.parquet")
+
+
+CAMINHO_CAMADA = caminho_camada()
+
+
+def _chave_cache(caminho_shape, tolerancia):
+    # O shapefile é um conjunto de arquivos (.shp, .dbf, .shx, .prj...) com o mesmo nome-base
+    arquivos = sorted(glob.glob(os.path.splitext(caminho_shape)[0] + ".*"))
+    estados = [(os.path.basename(a), os.stat(a).st_size, os.stat(a).st_mtime_ns) for a in arquivos]
+    conteudo = json.dumps({"arquivos": estados, "tolerancia": tolerancia, "casas": CASAS_DECIMAIS})
+    return hashlib.sha256(conteudo.encode("utf-8")).hexdigest()
+
+
+def simplificar(geometrias, tolerancia):
+    """Simplifica preservando as fronteiras compartilhadas (quando o shapely/GEOS oferece suporte)."""
+    if hasattr(shapely, "coverage_simplify"):
+        return shapely.coverage_simplify(geometrias, tolerancia)
+    return shapely.simplify(geometrias, tolerancia, preserve_topology=True)
+
+
+def construir_camada(caminho_shape=CAMINHO_SHAPEFILE, tolerancia=TOLERANCIA_SIMPLIFICACAO):
+    """Lê o shapefile e devolve a camada reprojetada, simplificada (se `tolerancia` > 0) e com centroides."""
+    camada = gpd.read_file(caminho_shape, encoding="utf-8")
+    if camada.crs is None:
+        camada = camada.set_crs(epsg=CRS_ORIGINAL)
+
+    centroides = camada.geometry.to_crs(epsg=CRS_METRICO).centroid.to_crs(epsg=CRS_MAPA)
+    camada = camada.to_crs(epsg=CRS_MAPA)
+    camada["centroide_lat"] = centroides.y.round(6)
+    camada["centroide_lon"] = centroides.x.round(6)
+
+    if tolerancia <= 0:
+        return camada
+    geometrias = simplificar(np.asarray(camada.geometry.array), tolerancia)
+    geometrias = shapely.transform(geometrias, lambda coordenadas: np.round(coordenadas, CASAS_DECIMAIS))
+    return camada.set_geometry(gpd.GeoSeries(geometrias, index=camada.index, crs=camada.crs))
+
+
+def carregar_camada_goias(caminho_shape=CAMINHO_SHAPEFILE, tolerancia=TOLERANCIA_SIMPLIFICACAO, caminho_cache=None):
+    """Camada de municípios pronta para o mapa, lida do cache GeoParquet (refeito se estiver desatualizado)."""
+    caminho_cache = caminho_cache or caminho_camada(tolerancia)
+    chave = _chave_cache(caminho_shape, tolerancia)
+    caminho_chave = f"{caminho_cache}.chave"
+    try:
+        with open(caminho_chave, encoding="utf-8") as arquivo:
+            if arquivo.read() == chave:
+                return gpd.read_parquet(caminho_cache)
+    except FileNotFoundError:
+        pass
+
+    if not os.path.exists(caminho_shape):
+        raise FileNotFoundError(f"Shapefile não encontrado: {caminho_shape}")
+    print(f"🔄 Gerando a camada simplificada de `{caminho_shape}`...")
+    camada = construir_camada(caminho_shape, tolerancia)
+    os.makedirs(os.path.dirname(caminho_cache), exist_ok=True)
+    camada.to_parquet(caminho_cache)
+    with open(caminho_chave, "w", encoding="utf-8") as arquivo:
+        arquivo.write(chave)
+    return camada
+
+
+def geojson_camada(camada, colunas=("NM_MUN",)):
+    """GeoJSON enxuto para o folium: só a geometria simplificada e as `colunas` pedidas."""
+    colunas = [coluna for coluna in colunas if coluna in camada.columns]
+    return camada[colunas + [camada.geometry.name]].to_json(drop_id=True)
+
+
+# Permite gerar o cache como etapa própria do pipeline, antes dos mapas 2.4 e 2.5 e do 1.2
+# (que usa a geometria original, tolerância 0, para atribuir o município IBGE)
+if __name__ == "__main__":
+    carregar_camada_goias(tolerancia=0)
+    camada = carregar_camada_goias()
+    print(f"✅ Camada com {len(camada)} municípios disponível em `{CAMINHO_CAMADA}` "
+          f"(GeoJSON do mapa: {len(geojson_camada(camada)) / 1024:.0f} KB).")
@@ -0,0 +1,64 @@
+"""Conversão vetorizada de datas e horários das bases climática e operacional.
+
+As datas são convertidas com formatos explícitos (sem inferência linha a
+linha) e `Data_Hora` é montada diretamente como datetime64 somando à data o
+horário extraído de `Hora UTC` (HHMM), sem passar por strings intermediárias.
+"""
+import numpy as np
+import pandas as pd
+
+FORMATOS_CLIMA = ['%d/%m/%Y', '%Y/%m/%d', '%Y-%m-%d']
+FORMATOS_OPERACIONAL = [
+    '%d/%m/%Y %H:%M:%S',
+    '%d/%m/%Y %H:%M',
+    '%d/%m/%Y',
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%d',
+]
+FORMATOS_TRATADOS = ['%Y-%m-%d %H:%M:%S', '%Y-%m-%d']
+
+
+def converter_datas(serie, formatos):
+    """Converte `serie` para datetime64 testando cada formato explícito nas linhas ainda não convertidas.
+
+    O que não casar com nenhum formato cai na conversão genérica com
+    `dayfirst=True`; valores inválidos viram NaT.
+    """
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return serie
+
+    texto = serie.astype('string').str.strip()
+    resultado = pd.Series(pd.NaT, index=serie.index, dtype='datetime64[ns]')
+    pendentes = (texto.notna() & (texto != '')).to_numpy(dtype=bool, na_value=False)
+    for formato in formatos:
+        if not pendentes.any():
+            break
+        posicoes = np.flatnonzero(pendentes)
+        convertidas = pd.to_datetime(texto.iloc[posicoes], format=formato, errors='coerce').to_numpy()
+        casaram = ~np.isnat(convertidas)
+        resultado.iloc[posicoes[casaram]] = convertidas[casaram]
+        pendentes[posicoes[casaram]] = False
+
+    if pendentes.any():
+        resultado.iloc[np.flatnonzero(pendentes)] = pd.to_datetime(
+            texto[pendentes], errors='coerce', dayfirst=True
+        ).to_numpy()
+    return resultado
+
+
+def extrair_hhmm(hora_utc):
+    """Extrai o horário HHMM de `Hora UTC` (ex.: '1200 UTC') como inteiro; ausentes viram NA."""
+    return pd.to_numeric(hora_utc.astype('string').str.extract(r'(\d{4})', expand=False), errors='coerce')
+
+
+def montar_data_hora(data, hora_utc):
+    """Soma à data (datetime64) o horário HHMM de `Hora UTC` usando aritmética inteira."""
+    hhmm = extrair_hhmm(hora_utc)
+    minutos = (hhmm // 100) * 60 + hhmm % 100
+    return data + pd.to_timedelta(minutos.astype('float64'), unit='m')
+
+
+def formatar_hora(hora_utc):
+    """Formata `Hora UTC` como hh:mm:ss a partir do HHMM extraído."""
+    hhmm = hora_utc.astype('string').str.extract(r'(\d{4})', expand=False)
+    return hhmm.str[:2] + ':' + hhmm.str[2:] + ':00'
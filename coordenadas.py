@@ -0,0 +1,34 @@
+"""Normalização vetorizada das coordenadas das bases climática e operacional."""
+import pandas as pd
+
+# Precisão das coordenadas nas bases tratadas (~0,1 m)
+CASAS_DECIMAIS = 6
+
+
+def converter_coordenada(serie):
+    """Converte uma coluna de coordenadas (com vírgula decimal) para float; inválidos viram NaN."""
+    if serie.dtype == object:
+        serie = serie.astype(str).str.strip().str.replace(",", ".", regex=False)
+    return pd.to_numeric(serie, errors="coerce").astype("float64")
+
+
+def referencia_por_localidade(df):
+    """Retorna latitude/longitude conhecidas de cada `localidade` (última ocorrência válida)."""
+    validas = df[["localidade", "latitude", "longitude"]].dropna()
+    return validas.groupby("localidade", sort=False)[["latitude", "longitude"]].last()
+
+
+def preencher_por_localidade(df, referencia=None):
+    """Preenche latitude/longitude ausentes com as coordenadas conhecidas da mesma `localidade`."""
+    if referencia is None:
+        referencia = referencia_por_localidade(df)
+    for coluna in ["latitude", "longitude"]:
+        ausentes = df[coluna].isna()
+        if ausentes.any():
+            df.loc[ausentes, coluna] = df.loc[ausentes, "localidade"].map(referencia[coluna])
+    return df
+
+
+def arredondar_coordenada(serie):
+    """Mantém a coordenada numérica (float64) com precisão de 6 casas decimais."""
+    return serie.astype("float64").round(CASAS_DECIMAIS)
@@ -0,0 +1,127 @@
+"""Cubo climático denso estação × hora × variável, mapeado em memória a partir do disco.
+
+O script 1.1 grava, além da base longa em CSV, um array float32
+`[estacao, hora desde a primeira leitura, variavel]` em
+`cubo_climatico/valores.npy` e os rótulos dos eixos em
+`cubo_climatico/metadados.json`. O início e o número de horas vêm dos
+próprios dados (da primeira à última `Data_Hora`), e não de um período fixo,
+de modo que meses novos entram no cubo. Horas sem leitura ficam NaN. Com ~3,7 anos × 5 estações × 17 variáveis o cubo tem poucas
+dezenas de MB e é aberto com `mmap_mode="r"`: a leitura climática de uma
+ocorrência passa a ser um cálculo de índice inteiro (`valores[estacao, hora]`)
+em vez de uma junção contra a base longa.
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from fusao_estacoes import TOLERANCIA_PADRAO, extrair_estacoes, montar_cubo_horario
+from tratamento_clima import COLUNAS_REAIS
+
+PASTA_CUBO = "cubo_climatico"
+ARQUIVO_VALORES = "valores.npy"
+ARQUIVO_METADADOS = "metadados.json"
+
+
+def gravar_cubo(df_climatica, pasta=PASTA_CUBO, variaveis=None):
+    """Monta o cubo a partir da base climática tratada e grava os valores e os metadados em `pasta`."""
+    variaveis = variaveis or [coluna for coluna in COLUNAS_REAIS if coluna in df_climatica.columns]
+    estacoes = extrair_estacoes(df_climatica)
+    estacoes["ALTITUDE"] = df_climatica.groupby("ESTACAO", observed=True)["ALTITUDE"].median()
+    valores, inicio = montar_cubo_horario(df_climatica, estacoes, variaveis)
+
+    os.makedirs(pasta, exist_ok=True)
+    # Grava em arquivos temporários e só então substitui, para que um leitor nunca veja um cubo pela metade
+    caminho_valores = os.path.join(pasta, ARQUIVO_VALORES)
+    with open(f"{caminho_valores}.tmp", "wb") as arquivo:
+        np.save(arquivo, valores)
+    metadados = {
+        "inicio": inicio.isoformat(),
+        "n_horas": int(valores.shape[1]),
+        "variaveis": variaveis,
+        "estacoes": estacoes.reset_index().astype({"ESTACAO": str}).to_dict(orient="records"),
+    }
+    caminho_metadados = os.path.join(pasta, ARQUIVO_METADADOS)
+    with open(f"{caminho_metadados}.tmp", "w", encoding="utf-8") as arquivo:
+        json.dump(metadados, arquivo, ensure_ascii=False, indent=2)
+    os.replace(f"{caminho_valores}.tmp", caminho_valores)
+    os.replace(f"{caminho_metadados}.tmp", caminho_metadados)
+    return valores.nbytes
+
+
+class CuboClimatico:
+    """Cubo estação × hora × variável com os rótulos dos eixos e o cálculo dos índices."""
+
+    def __init__(self, valores, estacoes, variaveis, inicio):
+        self.valores = valores
+        self.estacoes = estacoes
+        self.variaveis = list(variaveis)
+        self.inicio = pd.Timestamp(inicio)
+        self._posicao_variavel = {variavel: i for i, variavel in enumerate(self.variaveis)}
+
+    @classmethod
+    def carregar(cls, pasta=PASTA_CUBO, mmap_mode="r"):
+        """Abre o cubo gravado por `gravar_cubo` (FileNotFoundError se o 1.1 ainda não o gerou)."""
+        with open(os.path.join(pasta, ARQUIVO_METADADOS), encoding="utf-8") as arquivo:
+            metadados = json.load(arquivo)
+        valores = np.load(os.path.join(pasta, ARQUIVO_VALORES), mmap_mode=mmap_mode)
+        estacoes = pd.DataFrame(metadados["estacoes"]).set_index("ESTACAO")
+        if valores.shape[1] != metadados["n_horas"]:
+            raise ValueError(f"Cubo em `{pasta}` inconsistente: {valores.shape[1]} horas no array e "
+                             f"{metadados['n_horas']} nos metadados; regenere-o com o 1.1.")
+        return cls(valores, estacoes, metadados["variaveis"], metadados["inicio"])
+
+    @property
+    def n_horas(self):
+        return self.valores.shape[1]
+
+    def indices_estacao(self, nomes):
+        """Posição de cada estação no eixo 0 (-1 para ausentes ou desconhecidas)."""
+        return self.estacoes.index.get_indexer(pd.Index(nomes, dtype=object))
+
+    def indices_hora(self, datas, tolerancia=TOLERANCIA_PADRAO):
+        """Hora cheia mais próxima de cada data no eixo 1 (-1 fora do cubo ou além da `tolerancia`)."""
+        horas = ((pd.Series(datas) - self.inicio) / pd.Timedelta("1h")).to_numpy(dtype=np.float64, na_value=np.nan)
+        hora = np.round(horas)
+        validas = (
+            np.isfinite(hora) & (hora >= 0) & (hora < self.n_horas)
+            & (np.abs(horas - hora) <= pd.Timedelta(tolerancia) / pd.Timedelta("1h"))
+        )
+        return np.where(validas, hora, -1).astype(np.int64)
+
+    def indices_variavel(self, variaveis):
+        return np.array([self._posicao_variavel[variavel] for variavel in variaveis], dtype=np.int64)
+
+    def datas_hora(self, hora):
+        """Instante de cada índice de hora (NaT para -1)."""
+        hora = np.asarray(hora)
+        datas = self.inicio + pd.to_timedelta(np.where(hora >= 0, hora, 0), unit="h")
+        return np.where(hora >= 0, datas.to_numpy(), np.datetime64("NaT"))
+
+    def consultar(self, estacao, hora, variaveis=None):
+        """Leituras `[n, variaveis]` nos pares (estação, hora) dados; NaN onde algum índice é -1."""
+        estacao, hora = np.asarray(estacao), np.asarray(hora)
+        colunas = self.indices_variavel(variaveis) if variaveis is not None else slice(None)
+        validas = (estacao >= 0) & (hora >= 0)
+        n_variaveis = len(variaveis) if variaveis is not None else len(self.variaveis)
+        resultado = np.full((len(estacao), n_variaveis), np.nan, dtype=np.float32)
+        resultado[validas] = self.valores[estacao[validas], hora[validas]][:, colunas]
+        return resultado
+
+    def leituras(self, variaveis=None):
+        """Leituras das `variaveis` empilhadas (uma linha por estação × hora com ao menos um valor), para a EDA."""
+        variaveis = variaveis or self.variaveis
+        colunas = self.indices_variavel(variaveis)
+        matriz = np.asarray(self.valores[:, :, colunas]).reshape(-1, len(variaveis))
+        return pd.DataFrame(matriz, columns=variaveis).dropna(how="all").reset_index(drop=True)
+
+
+# Permite regenerar só o cubo a partir da base climática já tratada
+if __name__ == "__main__":
+    from esquema_bases import ler_base
+
+    base = ler_base("base_climatica_tratada.csv", "clima")
+    tamanho = gravar_cubo(base)
+    cubo = CuboClimatico.carregar()
+    print(f"✅ Cubo {cubo.valores.shape} ({tamanho / 1024 ** 2:.1f} MB) gravado em `{PASTA_CUBO}/`.")
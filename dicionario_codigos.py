@@ -0,0 +1,70 @@
+"""Dicionário persistente e estável de códigos para `tipo_servico` e `des_atividade`.
+
+Cada categoria recebe um código inteiro que nunca muda entre execuções: o
+dicionário é gravado em `dicionario_codigos.json` e novas categorias só são
+acrescentadas, com códigos sequenciais a partir do maior já usado (em ordem
+alfabética dentro de cada lote, para que o resultado não dependa da ordem
+das linhas). A consulta é vetorizada via códigos de `pd.Categorical`.
+
+Os códigos seguem, portanto, a ordem de primeira aparição por lote: numa
+primeira execução em streaming (1.2 em blocos) uma categoria nova recebe o
+código do bloco em que aparece pela primeira vez, e com outro `chunksize` os
+códigos podem sair diferentes. Depois de gravados eles não mudam mais; para
+reproduzir a mesma numeração, reaproveite o `dicionario_codigos.json`.
+
+Os códigos são gravados como `Int16` (ver `esquema_bases`), o que limita
+cada coluna a `CODIGO_MAXIMO - CODIGO_INICIAL + 1` categorias; passar disso é
+um erro explícito em vez de um estouro silencioso.
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+CAMINHO_DICIONARIO = 'dicionario_codigos.json'
+CODIGO_INICIAL = 1000
+CODIGO_MAXIMO = int(np.iinfo(np.int16).max)
+
+
+def carregar_dicionario(caminho=CAMINHO_DICIONARIO):
+    """Carrega o dicionário {coluna: {categoria: código}}; vazio se o arquivo não existir."""
+    if not os.path.exists(caminho):
+        return {}
+    with open(caminho, encoding='utf-8') as arquivo:
+        return json.load(arquivo)
+
+
+def salvar_dicionario(dicionario, caminho=CAMINHO_DICIONARIO):
+    """Grava o dicionário de forma atômica (arquivo temporário + rename)."""
+    temporario = f'{caminho}.tmp'
+    with open(temporario, 'w', encoding='utf-8') as arquivo:
+        json.dump(dicionario, arquivo, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(temporario, caminho)
+
+
+def atualizar_dicionario(dicionario, coluna, serie):
+    """Acrescenta ao dicionário da `coluna` as categorias de `serie` ainda sem código."""
+    codigos = dicionario.setdefault(coluna, {})
+    valores = pd.unique(serie.dropna().astype(str))
+    novas = sorted(set(valores).difference(codigos))
+    proximo = max(codigos.values(), default=CODIGO_INICIAL - 1) + 1
+    if proximo + len(novas) - 1 > CODIGO_MAXIMO:
+        raise ValueError(
+            f"O dicionário de `{coluna}` excederia o código {CODIGO_MAXIMO} (limite do Int16) com "
+            f"{len(novas)} categorias novas; amplie o tipo de `{coluna}_code` em esquema_bases e em `codificar`."
+        )
+    for deslocamento, categoria in enumerate(novas):
+        codigos[categoria] = proximo + deslocamento
+    return len(novas)
+
+
+def codificar(serie, codigos):
+    """Mapeia `serie` para os códigos do dicionário; categorias desconhecidas ou nulas viram NA."""
+    categorias = list(codigos)
+    tabela = np.fromiter((codigos[c] for c in categorias), dtype=np.int64, count=len(categorias))
+    posicoes = pd.Categorical(serie.astype('string'), categories=categorias).codes
+    conhecidas = posicoes >= 0
+    resultado = pd.Series(pd.NA, index=serie.index, dtype='Int16', name=f'{serie.name}_code')
+    resultado[conhecidas] = tabela[posicoes[conhecidas]]
+    return resultado
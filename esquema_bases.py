@@ -0,0 +1,85 @@
+"""Esquema de tipos declarado das bases tratadas e da base fusionada.
+
+Textos de baixa cardinalidade viram `category`, códigos usam o menor inteiro
+que os comporta e as leituras climáticas usam float32. As coordenadas
+permanecem float64 para não perder a sexta casa decimal, e os valores
+monetários e quantidades também, para não perder centavos (float32 tem só
+~7 dígitos significativos) nem precisão em somas sobre milhões de linhas. Todo script que lê
+uma dessas bases deve usar `ler_base` (CSV) ou `aplicar_esquema` (DataFrame
+já carregado), para que os tipos sejam os mesmos em todo o pipeline.
+"""
+import pandas as pd
+
+from conversao_datas import FORMATOS_TRATADOS, converter_datas
+from tratamento_clima import COLUNAS_REAIS, VARIAVEIS_CONTINUAS
+
+ESQUEMA_OPERACIONAL = {
+    'tipo_servico': 'category',
+    'des_atividade': 'category',
+    'localidade': 'category',
+    'municipio': 'category',
+    'unidade_medida': 'category',
+    'tipo_servico_code': 'Int16',
+    'des_atividade_code': 'Int16',
+    'latitude': 'float64',
+    'longitude': 'float64',
+    'valor_unitario': 'float64',
+    'valor_total': 'float64',
+}
+DATAS_OPERACIONAL = ['data_servico', 'data_deslocamento', 'data_inicio', 'data_fim']
+
+ESQUEMA_CLIMA = {
+    'ESTACAO': 'category',
+    'REGIAO': 'category',
+    'UF': 'category',
+    'CODIGO (WMO)': 'category',
+    'Hora UTC': 'category',
+    'LATITUDE': 'float64',
+    'LONGITUDE': 'float64',
+    'ALTITUDE': 'float32',
+    **{coluna: 'float32' for coluna in COLUNAS_REAIS},
+    **{f'{coluna}_normalizada': 'float32' for coluna in VARIAVEIS_CONTINUAS},
+}
+DATAS_CLIMA = ['Data', 'Data_Hora']
+
+ESQUEMA_FUSIONADA = {
+    **ESQUEMA_OPERACIONAL,
+    **ESQUEMA_CLIMA,
+    'qtd_atividade': 'float64',
+    'qtd_atividade_bin': 'int8',
+}
+DATAS_FUSIONADA = DATAS_OPERACIONAL + DATAS_CLIMA
+
+ESQUEMAS = {
+    'operacional': (ESQUEMA_OPERACIONAL, DATAS_OPERACIONAL),
+    'clima': (ESQUEMA_CLIMA, DATAS_CLIMA),
+    'fusionada': (ESQUEMA_FUSIONADA, DATAS_FUSIONADA),
+}
+
+
+def aplicar_esquema(df, nome):
+    """Converte as colunas presentes em `df` para os tipos declarados no esquema `nome`."""
+    tipos, datas = ESQUEMAS[nome]
+    for coluna in datas:
+        if coluna in df.columns:
+            df[coluna] = converter_datas(df[coluna], FORMATOS_TRATADOS)
+    for coluna, tipo in tipos.items():
+        if coluna in df.columns and str(df[coluna].dtype) != tipo:
+            if tipo.startswith('Int') and not pd.api.types.is_numeric_dtype(df[coluna]):
+                df[coluna] = pd.to_numeric(df[coluna], errors='coerce')
+            df[coluna] = df[coluna].astype(tipo)
+    return df
+
+
+def ler_base(caminho, nome, usecols=None, **kwargs):
+    """Lê uma base tratada/fusionada em CSV já com os tipos do esquema `nome`.
+
+    Apenas as colunas do esquema presentes no arquivo (e em `usecols`) recebem
+    `dtype` na leitura; as colunas de data são convertidas com formatos explícitos.
+    """
+    tipos, _ = ESQUEMAS[nome]
+    cabecalho = pd.read_csv(caminho, delimiter=';', encoding='utf-8', nrows=0).columns
+    colunas = cabecalho if usecols is None else [coluna for coluna in cabecalho if coluna in usecols]
+    dtype = {coluna: tipo for coluna, tipo in tipos.items() if coluna in colunas and not tipo.startswith('Int')}
+    df = pd.read_csv(caminho, delimiter=';', encoding='utf-8', usecols=usecols, dtype=dtype, **kwargs)
+    return aplicar_esquema(df, nome)
@@ -0,0 +1,135 @@
+"""Detecção de eventos climáticos extremos e tabelas agregadas em cache.
+
+Uma leitura horária é considerada evento extremo quando qualquer variável
+ultrapassa o seu limiar (por padrão: precipitação > 50 mm, rajada > 15 m/s
+ou temperatura máxima > 40 °C). As contagens por dia/estação, por mês e por
+estação/mês são calculadas uma vez e gravadas em `cache_eventos/`; os scripts
+de análise leem apenas essas tabelas, de poucos KB.
+"""
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+from esquema_bases import ler_base
+
+CAMINHO_BASE_CLIMATICA = "base_climatica_tratada.csv"
+PASTA_CACHE = "cache_eventos"
+
+LIMIARES_PADRAO = {
+    "PRECIPITAÇÃO TOTAL, HORÁRIO (mm)": 50,
+    "VENTO, RAJADA MAXIMA (m/s)": 15,
+    "TEMPERATURA MÁXIMA NA HORA ANT. (AUT) (°C)": 40,
+}
+
+DESCRICAO_VARIAVEIS = {
+    "PRECIPITAÇÃO TOTAL, HORÁRIO (mm)": ("Precipitação", "mm"),
+    "VENTO, RAJADA MAXIMA (m/s)": ("Rajadas de vento", "m/s"),
+    "TEMPERATURA MÁXIMA NA HORA ANT. (AUT) (°C)": ("Temperatura máxima", "ºC"),
+}
+
+TABELAS = ["por_dia_estacao", "por_mes", "por_estacao_mes"]
+
+
+def mascara_eventos(df, limiares=None):
+    """Retorna uma série booleana marcando as leituras que são eventos extremos."""
+    limiares = limiares or LIMIARES_PADRAO
+    mascara = pd.Series(False, index=df.index)
+    for coluna, limiar in limiares.items():
+        mascara |= df[coluna] > limiar
+    return mascara
+
+
+def descrever_limiares(limiares=None):
+    """Texto com os critérios usados, para legendas dos gráficos."""
+    limiares = limiares or LIMIARES_PADRAO
+    linhas = ["Critérios para Eventos Climáticos Extremos:"]
+    for coluna, limiar in limiares.items():
+        nome, unidade = DESCRICAO_VARIAVEIS.get(coluna, (coluna, ""))
+        linhas.append(f"- {nome} > {limiar:g} {unidade}".rstrip())
+    return "\n".join(linhas)
+
+
+def calcular_tabelas_eventos(df_clima, limiares=None):
+    """Calcula as tabelas agregadas de eventos extremos a partir da base climática tratada."""
+    eventos = df_clima.loc[mascara_eventos(df_clima, limiares), ["Data", "ESTACAO"]].copy()
+    eventos["AnoMes"] = eventos["Data"].dt.to_period("M")
+
+    por_dia_estacao = eventos.groupby(["Data", "ESTACAO"], observed=True).size().reset_index(name="Ocorrencias")
+    por_mes = eventos.groupby("AnoMes").size().rename("Eventos Extremos")
+    por_estacao_mes = eventos.groupby(["AnoMes", "ESTACAO"], observed=True).size().reset_index(name="Ocorrencias")
+    return {
+        "por_dia_estacao": por_dia_estacao,
+        "por_mes": por_mes,
+        "por_estacao_mes": por_estacao_mes,
+    }
+
+
+def _chave_cache(caminho_base, limiares):
+    estado = os.stat(caminho_base)
+    conteudo = json.dumps(
+        {"base": os.path.abspath(caminho_base), "tamanho": estado.st_size,
+         "mtime": estado.st_mtime_ns, "limiares": limiares},
+        sort_keys=True, ensure_ascii=False,
+    )
+    return hashlib.sha256(conteudo.encode("utf-8")).hexdigest()
+
+
+def _salvar_cache(tabelas, pasta_cache, chave):
+    os.makedirs(pasta_cache, exist_ok=True)
+    por_mes = tabelas["por_mes"].reset_index()
+    por_mes["AnoMes"] = por_mes["AnoMes"].astype(str)
+    por_estacao_mes = tabelas["por_estacao_mes"].assign(AnoMes=lambda t: t["AnoMes"].astype(str))
+    tabelas["por_dia_estacao"].to_parquet(os.path.join(pasta_cache, "por_dia_estacao.parquet"), index=False)
+    por_mes.to_parquet(os.path.join(pasta_cache, "por_mes.parquet"), index=False)
+    por_estacao_mes.to_parquet(os.path.join(pasta_cache, "por_estacao_mes.parquet"), index=False)
+    with open(os.path.join(pasta_cache, "chave.json"), "w", encoding="utf-8") as arquivo:
+        json.dump({"chave": chave}, arquivo)
+
+
+def _ler_cache(pasta_cache, chave):
+    try:
+        with open(os.path.join(pasta_cache, "chave.json"), encoding="utf-8") as arquivo:
+            if json.load(arquivo).get("chave") != chave:
+                return None
+        tabelas = {nome: pd.read_parquet(os.path.join(pasta_cache, f"{nome}.parquet")) for nome in TABELAS}
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+    tabelas["por_mes"] = (
+        tabelas["por_mes"]
+        .assign(AnoMes=lambda t: pd.PeriodIndex(t["AnoMes"], freq="M"))
+        .set_index("AnoMes")["Eventos Extremos"]
+    )
+    tabelas["por_estacao_mes"]["AnoMes"] = pd.PeriodIndex(tabelas["por_estacao_mes"]["AnoMes"], freq="M")
+    return tabelas
+
+
+def carregar_tabelas_eventos(caminho_base=CAMINHO_BASE_CLIMATICA, limiares=None, pasta_cache=PASTA_CACHE):
+    """Devolve as tabelas de eventos extremos, recalculando-as só quando a base ou os limiares mudam.
+
+    Retorna um dicionário com:
+    - `por_dia_estacao`: colunas Data, ESTACAO e Ocorrencias;
+    - `por_mes`: série de contagens indexada por AnoMes (período mensal);
+    - `por_estacao_mes`: colunas AnoMes, ESTACAO e Ocorrencias.
+    """
+    limiares = limiares or LIMIARES_PADRAO
+    chave = _chave_cache(caminho_base, limiares)
+    tabelas = _ler_cache(pasta_cache, chave)
+    if tabelas is not None:
+        return tabelas
+
+    print(f"🔄 Calculando tabelas de eventos extremos a partir de '{caminho_base}'...")
+    df_clima = ler_base(caminho_base, "clima", usecols=["Data", "ESTACAO"] + list(limiares))
+    df_clima.dropna(subset=["Data"], inplace=True)
+
+    tabelas = calcular_tabelas_eventos(df_clima, limiares)
+    _salvar_cache(tabelas, pasta_cache, chave)
+    return tabelas
+
+
+# Permite pré-calcular o cache como etapa própria do pipeline, antes dos scripts 1.3 e 2.x
+if __name__ == "__main__":
+    carregar_tabelas_eventos()
+    print(f"✅ Tabelas de eventos extremos disponíveis em `{PASTA_CACHE}/`.")
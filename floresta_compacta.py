@@ -0,0 +1,113 @@
+"""Formato compacto do Random Forest, com previsão vetorizada sobre todas as árvores.
+
+Os nós de todas as árvores são concatenados em poucos arrays NumPy contíguos
+(variável, limiar, filho esquerdo, filho direito e probabilidades das
+classes). Gravados com `joblib.dump` sem compressão e lidos com
+`mmap_mode="r"`, esses arrays são mapeados em memória: a carga não recria
+nenhum objeto por árvore e vários processos de previsão compartilham a mesma
+cópia do modelo via cache de páginas do sistema operacional.
+
+Nas folhas os dois filhos apontam para o próprio nó e o limiar é +inf, de modo
+que a descida pode ser feita sempre pelo mesmo número de passos (a
+profundidade máxima), para todas as linhas e árvores ao mesmo tempo.
+
+Uso avulso para converter um modelo já treinado:
+`python floresta_compacta.py modelo_random_forest.joblib modelo_random_forest_compacto.joblib`.
+"""
+import sys
+
+import joblib
+import numpy as np
+
+# Limite de linhas x árvores avaliadas por vez na previsão
+ELEMENTOS_POR_LOTE = 4_000_000
+
+
+class FlorestaCompacta:
+    """Random Forest de classificação em arrays contíguos, com `predict` e `predict_proba`."""
+
+    def __init__(self, variavel, limiar, esquerda, direita, valor, raizes, classes, n_features, profundidade):
+        self.variavel = variavel
+        self.limiar = limiar
+        self.esquerda = esquerda
+        self.direita = direita
+        self.valor = valor
+        self.raizes = raizes
+        self.classes_ = classes
+        self.n_features_in_ = n_features
+        self.profundidade = profundidade
+
+    @classmethod
+    def de_sklearn(cls, modelo):
+        """Achata um `RandomForestClassifier` (ou `ExtraTreesClassifier`) já treinado."""
+        if modelo.n_outputs_ != 1:
+            raise ValueError("Apenas modelos com uma única saída podem ser compactados.")
+
+        partes = {nome: [] for nome in ("variavel", "limiar", "esquerda", "direita", "valor")}
+        raizes, deslocamento, profundidade = [], 0, 0
+        for estimador in modelo.estimators_:
+            arvore = estimador.tree_
+            nos = np.arange(arvore.node_count)
+            folha = arvore.children_left == -1
+
+            partes["variavel"].append(np.where(folha, 0, arvore.feature).astype(np.int32))
+            partes["limiar"].append(np.where(folha, np.inf, arvore.threshold))
+            partes["esquerda"].append((np.where(folha, nos, arvore.children_left) + deslocamento).astype(np.int32))
+            partes["direita"].append((np.where(folha, nos, arvore.children_right) + deslocamento).astype(np.int32))
+            valor = arvore.value[:, 0, :]
+            partes["valor"].append((valor / valor.sum(axis=1, keepdims=True)).astype(np.float32))
+
+            raizes.append(deslocamento)
+            deslocamento += arvore.node_count
+            profundidade = max(profundidade, arvore.max_depth)
+
+        arrays = {nome: np.ascontiguousarray(np.concatenate(lista)) for nome, lista in partes.items()}
+        return cls(
+            raizes=np.asarray(raizes, dtype=np.int32),
+            classes=np.asarray(modelo.classes_),
+            n_features=modelo.n_features_in_,
+            profundidade=profundidade,
+            **arrays,
+        )
+
+    def _folhas(self, X):
+        """Índice da folha alcançada em cada árvore, para cada linha de `X` (linhas x árvores)."""
+        # Mesma comparação do scikit-learn: X em float32 contra limiares em float64
+        X = np.asarray(X, dtype=np.float32)
+        linhas = np.arange(len(X))[:, None]
+        nos = np.broadcast_to(self.raizes, (len(X), len(self.raizes))).copy()
+        for _ in range(self.profundidade):
+            vai_esquerda = X[linhas, self.variavel[nos]] <= self.limiar[nos]
+            nos = np.where(vai_esquerda, self.esquerda[nos], self.direita[nos])
+        return nos
+
+    def predict_proba(self, X):
+        X = np.asarray(X)
+        if X.shape[1] != self.n_features_in_:
+            raise ValueError(f"Esperadas {self.n_features_in_} variáveis, recebidas {X.shape[1]}.")
+        tamanho_lote = max(1, ELEMENTOS_POR_LOTE // len(self.raizes))
+        probabilidades = np.empty((len(X), len(self.classes_)), dtype=np.float64)
+        for inicio in range(0, len(X), tamanho_lote):
+            folhas = self._folhas(X[inicio:inicio + tamanho_lote])
+            probabilidades[inicio:inicio + len(folhas)] = self.valor[folhas].mean(axis=1)
+        return probabilidades
+
+    def predict(self, X):
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1))
+
+
+def exportar_floresta(modelo, caminho):
+    """Grava a floresta compacta sem compressão, para permitir o mapeamento em memória."""
+    joblib.dump(FlorestaCompacta.de_sklearn(modelo), caminho)
+    return caminho
+
+
+def carregar_floresta(caminho, mmap_mode="r"):
+    return joblib.load(caminho, mmap_mode=mmap_mode)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        sys.exit("Uso: python floresta_compacta.py <modelo.joblib> <saida_compacta.joblib>")
+    exportar_floresta(joblib.load(sys.argv[1]), sys.argv[2])
+    print(f"✅ Floresta compacta salva como `{sys.argv[2]}`.")
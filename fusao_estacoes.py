@@ -0,0 +1,284 @@
+"""Fusão das ocorrências operacionais com as leituras horárias das estações.
+
+O índice espacial é construído somente sobre as estações distintas da base
+climática (e não sobre cada leitura horária). Cada ocorrência recebe a
+estação mais próxima e, em seguida, a leitura dessa estação mais próxima no
+tempo de `data_servico`, dentro de uma tolerância configurável.
+
+As leituras do INMET estão em UTC e `data_servico` está no horário local de
+Goiás (UTC-3, sem horário de verão no período) e, na prática, só tem a data.
+Antes de qualquer junção, `instante_utc` converte cada ocorrência para UTC e
+as que só têm data são posicionadas ao meio-dia local (15:00 UTC): sem isso
+toda ocorrência cairia na leitura de 00:00 UTC, isto é, às 21h do dia anterior.
+
+No modo interpolado (`fundir_por_interpolacao`), as variáveis climáticas de
+cada ocorrência são a média ponderada pelo inverso da distância (IDW) das
+leituras das k estações mais próximas na mesma hora.
+
+Em todos os modos a distância é medida em km (projeção equiretangular em
+torno da latitude média das estações), para que a estação mais próxima seja
+a mesma em qualquer modo.
+"""
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix
+from scipy.spatial import cKDTree
+
+TOLERANCIA_PADRAO = "1h"
+KM_POR_GRAU = 111.32
+COLUNAS_NAO_INTERPOLADAS = ["LATITUDE", "LONGITUDE", "ALTITUDE"]
+COLUNAS_TEMPO_CLIMA = ["Data", "Hora UTC", "Data_Hora"]
+# Variáveis angulares (graus): interpoladas pelas componentes seno e cosseno, e não pela média linear
+COLUNAS_CIRCULARES = ["VENTO, DIREÇÃO HORARIA (gr) (° (gr))"]
+
+FUSO_LOCAL = pd.Timedelta(hours=-3)  # Goiás (America/Sao_Paulo; sem horário de verão desde 2019)
+HORA_LOCAL_REFERENCIA = 12  # Hora local usada para as ocorrências registradas só com a data
+
+
+def instante_utc(data_servico):
+    """Converte `data_servico` (horário local) para UTC, posicionando as datas sem hora em HORA_LOCAL_REFERENCIA."""
+    datas = pd.Series(data_servico)
+    so_data = datas == datas.dt.normalize()
+    locais = datas.mask(so_data, datas + pd.Timedelta(hours=HORA_LOCAL_REFERENCIA))
+    return locais - FUSO_LOCAL
+
+
+def extrair_estacoes(df_climatica):
+    """Retorna um DataFrame com uma linha por estação e suas coordenadas."""
+    return (
+        df_climatica.groupby("ESTACAO", observed=True)[["LATITUDE", "LONGITUDE"]]
+        .median()
+        .dropna()
+    )
+
+
+def _coordenadas_planas(latitude, longitude, latitude_referencia):
+    """Projeção equiretangular em km, suficiente para ordenar e ponderar distâncias dentro do estado."""
+    escala_lon = KM_POR_GRAU * np.cos(np.radians(latitude_referencia))
+    return np.column_stack([latitude * KM_POR_GRAU, longitude * escala_lon])
+
+
+class _IndiceEstacoes:
+    """KDTree das estações em km, compartilhada pela fusão por estação e pela interpolação."""
+
+    def __init__(self, estacoes):
+        self.latitude_referencia = estacoes["LATITUDE"].mean()
+        self.arvore = cKDTree(self._planas(estacoes["LATITUDE"].to_numpy(), estacoes["LONGITUDE"].to_numpy()))
+
+    def _planas(self, latitude, longitude):
+        return _coordenadas_planas(latitude, longitude, self.latitude_referencia)
+
+    def consultar(self, latitude, longitude, k=1):
+        """Distâncias (km) e posições das `k` estações mais próximas, como matrizes (n, k)."""
+        distancias, indices = self.arvore.query(self._planas(latitude, longitude), k=k)
+        return distancias.reshape(len(latitude), k), indices.reshape(len(latitude), k)
+
+
+def associar_estacao_mais_proxima(df_operacional, estacoes):
+    """Retorna a série com a estação mais próxima de cada ocorrência (NaN sem coordenadas)."""
+    coordenadas = df_operacional[["latitude", "longitude"]]
+    validas = coordenadas.notna().all(axis=1).to_numpy()
+    latitude, longitude = coordenadas.to_numpy(dtype=np.float64)[validas].T
+    _, indices = _IndiceEstacoes(estacoes).consultar(latitude, longitude)
+    indices = indices[:, 0]
+
+    estacao = np.full(len(df_operacional), None, dtype=object)
+    estacao[validas] = estacoes.index.to_numpy()[indices]
+    return pd.Series(estacao, index=df_operacional.index, name="ESTACAO")
+
+
+def fundir_por_estacao(df_operacional, df_climatica, tolerancia=TOLERANCIA_PADRAO, direcao="nearest"):
+    """Junta a cada ocorrência a leitura horária da sua estação mais próxima no tempo.
+
+    A junção é um `merge_asof` do instante UTC da ocorrência (`instante_utc`)
+    contra `Data_Hora`, agrupado por estação. Ocorrências sem coordenadas, sem data ou sem leitura dentro
+    da `tolerancia` ficam com as colunas climáticas vazias. A ordem original
+    das ocorrências é preservada.
+    """
+    estacoes = extrair_estacoes(df_climatica)
+
+    esquerda = df_operacional.copy()
+    esquerda["ESTACAO"] = associar_estacao_mais_proxima(esquerda, estacoes)
+    esquerda["_ordem"] = np.arange(len(esquerda))
+    esquerda["_instante"] = instante_utc(esquerda["data_servico"])
+
+    direita = df_climatica.dropna(subset=["Data_Hora"]).sort_values("Data_Hora")
+    direita["ESTACAO"] = direita["ESTACAO"].astype(object)
+
+    casaveis = esquerda["ESTACAO"].notna() & esquerda["data_servico"].notna()
+    fundidas = pd.merge_asof(
+        esquerda[casaveis].sort_values("_instante"),
+        direita,
+        left_on="_instante",
+        right_on="Data_Hora",
+        by="ESTACAO",
+        tolerance=pd.Timedelta(tolerancia),
+        direction=direcao,
+    )
+
+    resultado = pd.concat([fundidas, esquerda[~casaveis]], ignore_index=True)
+    resultado = resultado.sort_values("_ordem").drop(columns=["_ordem", "_instante"]).reset_index(drop=True)
+    return resultado
+
+
+def variaveis_interpolaveis(df_climatica):
+    """Colunas numéricas de leitura da base climática (exclui coordenadas e altitude)."""
+    return [
+        coluna for coluna in df_climatica.columns
+        if coluna not in COLUNAS_NAO_INTERPOLADAS and pd.api.types.is_float_dtype(df_climatica[coluna])
+    ]
+
+
+def montar_cubo_horario(df_climatica, estacoes, variaveis, inicio=None, n_horas=None):
+    """Array estação × hora × variável (float32, NaN sem leitura) e o instante da hora 0.
+
+    As estações seguem a ordem de `estacoes.index` e as horas são contínuas a
+    partir de `inicio` (por padrão, a primeira `Data_Hora` da base), cobrindo
+    `n_horas` horas (por padrão, até a última leitura).
+    """
+    leituras = df_climatica.dropna(subset=["Data_Hora"])
+    posicao = pd.Index(estacoes.index).get_indexer(leituras["ESTACAO"].astype(object))
+    horas = leituras["Data_Hora"].dt.floor("h")
+    inicio = horas.min() if inicio is None else pd.Timestamp(inicio)
+    hora = ((horas - inicio) // pd.Timedelta("1h")).to_numpy(dtype=np.int64)
+    n_horas = hora.max() + 1 if n_horas is None else n_horas
+
+    cubo = np.full((len(estacoes), n_horas, len(variaveis)), np.nan, dtype=np.float32)
+    validas = (posicao >= 0) & (hora >= 0) & (hora < n_horas)
+    valores = leituras[variaveis].to_numpy(dtype=np.float32, na_value=np.nan)
+    cubo[posicao[validas], hora[validas]] = valores[validas]
+    return cubo, inicio
+
+
+def _expandir_circulares(leituras, variaveis):
+    """Acrescenta às leituras as colunas seno e cosseno de cada variável de COLUNAS_CIRCULARES."""
+    circulares = [i for i, variavel in enumerate(variaveis) if variavel in COLUNAS_CIRCULARES]
+    if not circulares:
+        return leituras, circulares
+    radianos = np.radians(leituras[:, circulares])
+    return np.hstack([leituras, np.sin(radianos), np.cos(radianos)]), circulares
+
+
+def fundir_por_interpolacao(df_operacional, df_climatica=None, k=3, potencia=2, tolerancia=TOLERANCIA_PADRAO,
+                            variaveis=None, cubo=None):
+    """Interpola por IDW, para cada ocorrência, as leituras das `k` estações mais próximas na mesma hora.
+
+    A hora de cada ocorrência é o seu instante UTC (`instante_utc`) arredondado para a hora cheia
+    (descartada se o arredondamento exceder a `tolerancia`). O cálculo é um
+    produto de uma matriz esparsa de pesos (ocorrências × estação·hora, com `k`
+    pesos 1/d^`potencia` por linha) pelo cubo estação × hora. Estações sem
+    leitura naquela hora saem da média e os pesos das demais são
+    renormalizados. `potencia=0` dá a média simples das k estações mais próximas.
+
+    Variáveis angulares (COLUNAS_CIRCULARES, como a direção do vento) são
+    interpoladas pelas componentes seno e cosseno e convertidas de volta
+    para graus em [0, 360).
+
+    A partir da base longa, o resultado tem as mesmas colunas de
+    `fundir_por_estacao`: `ESTACAO` é a estação mais próxima, as colunas fixas
+    da estação (coordenadas, altitude, UF...) são as dela e `Data_Hora`,
+    `Data` e `Hora UTC` descrevem a hora usada na interpolação.
+    Com um `cubo` (`cubo_climatico.CuboClimatico`), as leituras vêm direto do
+    cubo em disco, `df_climatica` não é necessária e as colunas são as de
+    `fundir_por_cubo`.
+    """
+    if cubo is not None:
+        estacoes, variaveis, valores, inicio = cubo.estacoes, cubo.variaveis, cubo.valores, cubo.inicio
+        fixas_estacao = estacoes
+        colunas_clima = None
+    else:
+        variaveis = variaveis or variaveis_interpolaveis(df_climatica)
+        estacoes = extrair_estacoes(df_climatica)
+        valores, inicio = montar_cubo_horario(df_climatica, estacoes, variaveis)
+        colunas_clima = [coluna for coluna in df_climatica.columns if coluna != "ESTACAO"]
+        fixas = [coluna for coluna in colunas_clima if coluna not in variaveis and coluna not in COLUNAS_TEMPO_CLIMA]
+        fixas_estacao = df_climatica.groupby("ESTACAO", observed=True)[fixas].first().reindex(estacoes.index)
+    n_estacoes, n_horas, _ = valores.shape
+    k = min(k, n_estacoes)
+
+    latitude = df_operacional["latitude"].to_numpy(dtype=np.float64, na_value=np.nan)
+    longitude = df_operacional["longitude"].to_numpy(dtype=np.float64, na_value=np.nan)
+    horas = ((instante_utc(df_operacional["data_servico"]) - inicio) / pd.Timedelta("1h")).to_numpy(dtype=np.float64, na_value=np.nan)
+    hora = np.round(horas)
+    validas = (
+        np.isfinite(latitude) & np.isfinite(longitude) & np.isfinite(hora)
+        & (hora >= 0) & (hora < n_horas)
+        & (np.abs(horas - hora) <= pd.Timedelta(tolerancia) / pd.Timedelta("1h"))
+    )
+    posicoes = np.flatnonzero(validas)
+
+    distancias, indices = _IndiceEstacoes(estacoes).consultar(latitude[posicoes], longitude[posicoes], k=k)
+
+    # Uma ocorrência exatamente sobre a estação fica, na prática, só com a leitura dela
+    pesos = 1.0 / np.maximum(distancias, 1e-6) ** potencia
+    colunas = indices * n_horas + hora[posicoes].astype(np.int64)[:, None]
+    matriz_pesos = csr_matrix(
+        (pesos.ravel(), (np.repeat(posicoes, k), colunas.ravel())),
+        shape=(len(df_operacional), n_estacoes * n_horas),
+    )
+
+    leituras, circulares = _expandir_circulares(np.asarray(valores).reshape(n_estacoes * n_horas, -1), variaveis)
+    presentes = ~np.isnan(leituras)
+    numerador = matriz_pesos @ np.where(presentes, leituras, 0)
+    denominador = matriz_pesos @ presentes.astype(np.float32)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        interpoladas = numerador / denominador
+    if circulares:
+        seno = interpoladas[:, len(variaveis):len(variaveis) + len(circulares)]
+        cosseno = interpoladas[:, len(variaveis) + len(circulares):]
+        interpoladas[:, circulares] = np.degrees(np.arctan2(seno, cosseno)) % 360
+    interpoladas = interpoladas[:, :len(variaveis)].astype(np.float32)
+
+    resultado = df_operacional.copy()
+    estacao = np.full(len(resultado), None, dtype=object)
+    estacao[posicoes] = estacoes.index.to_numpy()[indices[:, 0]]
+    data_hora = pd.Series(pd.NaT, index=resultado.index, dtype="datetime64[ns]")
+    data_hora.iloc[posicoes] = (inicio + pd.to_timedelta(hora[posicoes], unit="h")).to_numpy()
+
+    resultado["ESTACAO"] = estacao
+    for coluna in fixas_estacao.columns:
+        valores_fixos = np.full(len(resultado), None, dtype=object)
+        valores_fixos[posicoes] = fixas_estacao[coluna].to_numpy(dtype=object)[indices[:, 0]]
+        resultado[coluna] = pd.Series(valores_fixos, index=resultado.index).infer_objects()
+    resultado["Data_Hora"] = data_hora
+    if colunas_clima is not None:
+        resultado["Data"] = data_hora.dt.normalize()
+        resultado["Hora UTC"] = data_hora.dt.strftime("%H:%M:%S")
+    resultado[variaveis] = pd.DataFrame(interpoladas, columns=variaveis, index=resultado.index)
+
+    if colunas_clima is not None:
+        # Mesma ordem de colunas da junção `fundir_por_estacao`
+        resultado = resultado[list(df_operacional.columns) + ["ESTACAO"] + colunas_clima]
+    return resultado
+
+
+def fundir_por_cubo(df_operacional, cubo, tolerancia=TOLERANCIA_PADRAO):
+    """Fusão pela estação mais próxima por indexação direta no cubo estação × hora (modo opcional).
+
+    Cada ocorrência recebe a estação mais próxima e a leitura da hora cheia
+    mais próxima do instante UTC da ocorrência (se dentro da `tolerancia`), lidas em
+    `cubo.valores[estacao, hora]` sem nenhuma junção. Difere de
+    `fundir_por_estacao` em dois pontos: traz apenas as variáveis do cubo,
+    `ESTACAO`, `Data_Hora` e as coordenadas/altitude da estação (sem `Data`,
+    `Hora UTC` e as colunas normalizadas), e fica NaN se aquela hora não tem
+    leitura, em vez de procurar a leitura vizinha dentro da tolerância.
+    """
+    resultado = df_operacional.copy()
+    resultado["ESTACAO"] = associar_estacao_mais_proxima(resultado, cubo.estacoes)
+    estacao = cubo.indices_estacao(resultado["ESTACAO"])
+    hora = cubo.indices_hora(instante_utc(resultado["data_servico"]), tolerancia)
+
+    resultado["Data_Hora"] = cubo.datas_hora(hora)
+    for coluna in cubo.estacoes.columns:
+        resultado[coluna] = np.where(estacao >= 0, cubo.estacoes[coluna].to_numpy()[estacao], np.nan)
+    resultado[cubo.variaveis] = pd.DataFrame(cubo.consultar(estacao, hora), columns=cubo.variaveis, index=resultado.index)
+    return resultado
+
+
+def criar_variavel_alvo(df):
+    """Converte `qtd_atividade` (formato 1.234,5) para número e cria o alvo binário `qtd_atividade_bin`."""
+    df["qtd_atividade"] = df["qtd_atividade"].astype(str).str.replace(r"\.", "", regex=True)  # Remove pontos (milhar)
+    df["qtd_atividade"] = df["qtd_atividade"].str.replace(",", ".", regex=True)  # Converte vírgula para ponto decimal
+    df["qtd_atividade"] = pd.to_numeric(df["qtd_atividade"], errors="coerce")  # Converte para float
+    df["qtd_atividade_bin"] = (df["qtd_atividade"] > 0).astype("int8")
+    return df
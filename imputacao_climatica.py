@@ -0,0 +1,65 @@
+"""Imputação em lote das variáveis climáticas contínuas.
+
+Todas as colunas-alvo são tratadas de uma vez: a matriz de preditores
+(float32) é montada uma única vez e repassada inteira a cada tarefa, que
+recebe apenas os índices das suas colunas; o joblib mapeia essa matriz em
+memória compartilhada entre os processos em vez de copiá-la por tarefa. Um
+`HistGradientBoostingRegressor` por coluna é ajustado em paralelo entre os
+núcleos (a discretização em faixas é feita pelo próprio modelo).
+Opcionalmente o treino usa uma amostra limitada a `max_amostras_treino` linhas.
+"""
+import time
+
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.ensemble import HistGradientBoostingRegressor
+
+
+def _ajustar_coluna(coluna, X, alvo, preditores, max_amostras_treino, random_state):
+    inicio = time.perf_counter()
+    y = X[:, alvo]
+    faltantes = np.flatnonzero(np.isnan(y))
+    treino = ~np.isnan(y) & ~np.isnan(X[:, preditores]).any(axis=1)
+    indices_treino = np.flatnonzero(treino)
+    if indices_treino.size == 0:
+        # Nenhuma linha completa para treinar: a coluna fica como está
+        return coluna, None, time.perf_counter() - inicio, 0
+    if max_amostras_treino is not None and indices_treino.size > max_amostras_treino:
+        rng = np.random.default_rng(random_state)
+        indices_treino = np.sort(rng.choice(indices_treino, max_amostras_treino, replace=False))
+
+    modelo = HistGradientBoostingRegressor(random_state=random_state)
+    modelo.fit(X[np.ix_(indices_treino, preditores)], y[indices_treino])
+    previsoes = modelo.predict(X[np.ix_(faltantes, preditores)])
+    return coluna, previsoes, time.perf_counter() - inicio, indices_treino.size
+
+
+def imputar_em_lote(df, variaveis, n_jobs=-1, max_amostras_treino=None, random_state=42):
+    """Preenche os nulos de `variaveis` no próprio `df` e devolve o tempo de ajuste de cada coluna.
+
+    Para cada coluna-alvo, os preditores são as demais `variaveis`; o treino
+    usa as linhas completas e a previsão é feita nas linhas em que o alvo está
+    ausente (preditores ausentes são tratados nativamente pelo modelo).
+    Colunas sem nenhuma linha completa para treino são mantidas sem imputação.
+    """
+    variaveis = [coluna for coluna in variaveis if coluna in df.columns]
+    alvos = [coluna for coluna in variaveis if df[coluna].isnull().any()]
+    if not alvos:
+        return {}
+
+    X = df[variaveis].to_numpy(dtype=np.float32, na_value=np.nan)
+    tarefas = []
+    for coluna in alvos:
+        alvo = variaveis.index(coluna)
+        preditores = [j for j in range(len(variaveis)) if j != alvo]
+        tarefas.append(delayed(_ajustar_coluna)(coluna, X, alvo, preditores, max_amostras_treino, random_state))
+
+    tempos = {}
+    for coluna, previsoes, segundos, n_treino in Parallel(n_jobs=n_jobs)(tarefas):
+        if previsoes is None:
+            print(f"Sem linhas completas para treinar '{coluna}'; imputação ignorada.")
+            continue
+        df.loc[df[coluna].isnull(), coluna] = previsoes
+        tempos[coluna] = segundos
+        print(f"Tempo de ajuste para '{coluna}': {segundos:.2f}s ({n_treino} linhas de treino)")
+    return tempos
@@ -0,0 +1,301 @@
+"""Ingestão incremental (append-only) das bases climática e operacional.
+
+Em vez de reexecutar 1.1, 1.2 e 3.1 sobre todo o histórico, este script
+divide as bases brutas em partições mensais (AAAA-MM) e guarda, em
+`particoes_incrementais/manifesto.json`, uma assinatura (hash do conteúdo e
+número de linhas) de cada partição já tratada. A cada execução:
+
+1. as bases brutas são lidas em blocos apenas para recalcular as assinaturas;
+2. somente as partições novas ou alteradas são tratadas (mesmas etapas de
+   1.1 e 1.2) e gravadas em `particoes_incrementais/{clima,operacional}/`;
+3. os meses afetados são refundidos (mesma fusão do 3.1) e substituídos no
+   lugar em `base_fusionada_parquet/`, sem tocar nas demais partições;
+4. meses que sumiram das bases brutas saem do manifesto, das partições e da
+   base fusionada;
+5. havendo qualquer mudança, as bases tratadas em CSV (`base_*_tratada.csv`),
+   o cubo climático e as tabelas de eventos extremos são regerados a partir
+   das partições, para que 1.3 e 2.x enxerguem os mesmos dados.
+
+Uso: `python ingestao_incremental.py [--clima base_clima.csv] [--operacional base_operacional.csv]`.
+Na primeira execução (sem manifesto) todas as partições são processadas.
+Ao contrário de 1.1 e 1.2, o período não tem limite superior por padrão
+(`--data-fim` o define), para que os meses novos sejam de fato incorporados;
+meses que não geram nenhuma linha tratada são listados ao final de cada base.
+
+Cada mês climático alterado é tratado junto com os meses vizinhos brutos
+(lidos só como contexto e não regravados), para que a interpolação temporal
+por estação atravesse a virada do mês como na execução completa do 1.1. A
+imputação por modelo continua sendo uma aproximação: o modelo é treinado
+nesses meses (alterados e vizinhos), e não em todo o histórico, então os
+valores imputados podem diferir ligeiramente dos de uma execução completa.
+A normalização Min-Max da base climática reaproveita os limites da primeira
+execução, gravados no manifesto, para que partições antigas e novas sejam comparáveis.
+"""
+import argparse
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from base_colunar import salvar_base_fusionada_parquet, CAMINHO_PARQUET_FUSIONADA
+from cubo_climatico import gravar_cubo
+from conversao_datas import FORMATOS_CLIMA, FORMATOS_OPERACIONAL, converter_datas
+from dicionario_codigos import carregar_dicionario, salvar_dicionario
+from esquema_bases import aplicar_esquema
+from eventos_extremos import carregar_tabelas_eventos
+from fusao_estacoes import TOLERANCIA_PADRAO, fundir_por_estacao, criar_variavel_alvo
+from tratamento_clima import DATA_INICIO, tratar_base_climatica, normalizar_variaveis
+from tratamento_operacional import (
+    colunas_mantidas, referencia_localidades_em_blocos, tratar_bloco, carregar_indice_municipios
+)
+
+PASTA_PARTICOES = 'particoes_incrementais'
+CAMINHO_MANIFESTO = os.path.join(PASTA_PARTICOES, 'manifesto.json')
+BASES_TRATADAS = {'clima': 'base_climatica_tratada.csv', 'operacional': 'base_operacional_tratada.csv'}
+
+
+def carregar_manifesto(caminho=CAMINHO_MANIFESTO):
+    if not os.path.exists(caminho):
+        return {'clima': {}, 'operacional': {}, 'limites_normalizacao': None}
+    with open(caminho, encoding='utf-8') as arquivo:
+        return json.load(arquivo)
+
+
+def salvar_manifesto(manifesto, caminho=CAMINHO_MANIFESTO):
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    temporario = f'{caminho}.tmp'
+    with open(temporario, 'w', encoding='utf-8') as arquivo:
+        json.dump(manifesto, arquivo, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(temporario, caminho)
+
+
+def _particao(datas, formatos):
+    """Converte uma coluna de datas brutas na chave de partição AAAA-MM (NaN se inválida)."""
+    return converter_datas(datas, formatos).dt.strftime('%Y-%m')
+
+
+def assinaturas_por_particao(caminho, coluna_data, formatos, chunksize):
+    """Lê a base bruta em blocos e devolve {AAAA-MM: {'hash', 'linhas'}} de cada partição mensal.
+
+    O hash é a soma (módulo 2^64) dos hashes das linhas, portanto não depende
+    da ordem das linhas no arquivo.
+    """
+    somas, linhas = {}, {}
+    blocos = pd.read_csv(caminho, delimiter=';', encoding='utf-8', dtype=str, keep_default_na=False, chunksize=chunksize)
+    for bloco in blocos:
+        particoes = _particao(bloco[coluna_data], formatos)
+        hashes = pd.util.hash_pandas_object(bloco, index=False).to_numpy()
+        for chave, posicoes in particoes.groupby(particoes, sort=False).indices.items():
+            soma = np.add.reduce(hashes[posicoes], dtype=np.uint64)
+            somas[chave] = np.add(somas.get(chave, np.uint64(0)), soma, dtype=np.uint64)
+            linhas[chave] = linhas.get(chave, 0) + len(posicoes)
+    return {chave: {'hash': f'{int(somas[chave]):016x}', 'linhas': linhas[chave]} for chave in somas}
+
+
+def particoes_alteradas(assinaturas, registradas):
+    """Partições novas ou cuja assinatura mudou desde a última execução."""
+    return sorted(chave for chave, assinatura in assinaturas.items() if registradas.get(chave) != assinatura)
+
+
+def ler_particoes_brutas(caminho, coluna_data, formatos, particoes, chunksize, usecols=None):
+    """Lê da base bruta, em blocos, apenas as linhas das `particoes` pedidas."""
+    selecionadas = []
+    blocos = pd.read_csv(caminho, delimiter=';', encoding='utf-8', usecols=usecols, chunksize=chunksize)
+    for bloco in blocos:
+        manter = _particao(bloco[coluna_data].astype(str), formatos).isin(particoes).to_numpy()
+        if manter.any():
+            selecionadas.append(bloco[manter])
+    if not selecionadas:
+        return pd.DataFrame(columns=usecols)
+    return pd.concat(selecionadas, ignore_index=True)
+
+
+def _caminho_particao(base, chave):
+    return os.path.join(PASTA_PARTICOES, base, f'{chave}.parquet')
+
+
+def gravar_particoes(df, base, coluna_data, particoes):
+    """Grava uma partição Parquet por mês de `coluna_data`, substituindo as `particoes` reprocessadas.
+
+    Devolve as partições que ficaram vazias após o tratamento (e foram removidas).
+    """
+    os.makedirs(os.path.join(PASTA_PARTICOES, base), exist_ok=True)
+    df = aplicar_esquema(df, base)
+    for coluna in df.columns[df.dtypes == object]:
+        df[coluna] = df[coluna].astype('string')
+
+    chaves = df[coluna_data].dt.strftime('%Y-%m')
+    vazias = []
+    for chave in particoes:
+        caminho = _caminho_particao(base, chave)
+        parte = df[chaves == chave]
+        if parte.empty:
+            # A partição bruta não gerou linhas tratadas (ex.: fora do período pedido)
+            vazias.append(chave)
+            if os.path.exists(caminho):
+                os.remove(caminho)
+            continue
+        parte.to_parquet(caminho, engine='pyarrow', index=False)
+    return vazias
+
+
+def avisar_vazias(base, vazias):
+    if vazias:
+        print(f"⚠️ {len(vazias)} partições de `{base}` sem nenhuma linha após o tratamento "
+              f"(fora do período ou datas inválidas): {vazias}")
+
+
+def ler_particoes(base, chaves):
+    partes = [pd.read_parquet(_caminho_particao(base, chave)) for chave in chaves
+              if os.path.exists(_caminho_particao(base, chave))]
+    return pd.concat(partes, ignore_index=True) if partes else None
+
+
+def remover_particao_fusionada(chave, caminho=CAMINHO_PARQUET_FUSIONADA):
+    """Apaga da base fusionada o diretório `ano=/mes=` do mês AAAA-MM, se existir."""
+    mes = pd.Period(chave, freq='M')
+    diretorio = os.path.join(caminho, f'ano={mes.year}', f'mes={mes.month}')
+    if os.path.isdir(diretorio):
+        shutil.rmtree(diretorio)
+
+
+def remover_particoes_ausentes(manifesto, base, assinaturas):
+    """Tira do manifesto e do disco os meses registrados que não existem mais na base bruta."""
+    removidas = sorted(set(manifesto[base]) - set(assinaturas))
+    for chave in removidas:
+        caminho = _caminho_particao(base, chave)
+        if os.path.exists(caminho):
+            os.remove(caminho)
+        del manifesto[base][chave]
+    if removidas:
+        print(f"🗑️ {len(removidas)} partições de `{base}` ausentes da base bruta foram removidas: {removidas}")
+    return removidas
+
+
+def exportar_base_tratada(base, caminho):
+    """Regrava a base tratada em CSV a partir das partições, uma por vez (mesmo formato do 1.1/1.2)."""
+    import pyarrow.parquet as pq
+
+    chaves = sorted(os.path.splitext(nome)[0] for nome in os.listdir(os.path.join(PASTA_PARTICOES, base))
+                    if nome.endswith('.parquet'))
+    # As partições podem ter colunas diferentes (ex.: `municipio` só quando o shapefile estava disponível)
+    colunas = list(dict.fromkeys(
+        coluna for chave in chaves for coluna in pq.read_schema(_caminho_particao(base, chave)).names
+    ))
+    temporario = f'{caminho}.tmp'
+    for i, chave in enumerate(chaves):
+        parte = pd.read_parquet(_caminho_particao(base, chave)).reindex(columns=colunas)
+        parte.to_csv(temporario, sep=';', index=False, encoding='utf-8', mode='w' if i == 0 else 'a', header=(i == 0))
+    if chaves:
+        os.replace(temporario, caminho)
+    return len(chaves)
+
+
+def meses_vizinhos(chave):
+    mes = pd.Period(chave, freq='M')
+    return [str(mes - 1), chave, str(mes + 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingestão incremental das bases climática e operacional.")
+    parser.add_argument('--clima', default='base_clima.csv', help="Base climática bruta.")
+    parser.add_argument('--operacional', default='base_operacional.csv', help="Base operacional bruta.")
+    parser.add_argument('--chunksize', type=int, default=200_000, help="Linhas por bloco de leitura.")
+    parser.add_argument('--workers', type=int, default=None, help="Processos para o tratamento por estação.")
+    parser.add_argument('--tolerancia', default=TOLERANCIA_PADRAO, help="Tolerância da junção com a estação.")
+    parser.add_argument('--data-inicio', type=pd.Timestamp, default=DATA_INICIO, help="Primeira data mantida.")
+    parser.add_argument('--data-fim', type=pd.Timestamp, default=None,
+                        help="Última data mantida (padrão: sem limite, incorpora todos os meses novos).")
+    args = parser.parse_args()
+
+    manifesto = carregar_manifesto()
+
+    # 📌 1️⃣ Base climática: tratar apenas os meses novos ou alterados
+    print(f"🔎 Calculando assinaturas mensais de `{args.clima}`...")
+    assinaturas_clima = assinaturas_por_particao(args.clima, 'Data', FORMATOS_CLIMA, args.chunksize)
+    removidas_clima = remover_particoes_ausentes(manifesto, 'clima', assinaturas_clima)
+    alteradas_clima = particoes_alteradas(assinaturas_clima, manifesto['clima'])
+    print(f"✅ {len(alteradas_clima)} de {len(assinaturas_clima)} partições climáticas a processar: {alteradas_clima}")
+
+    if alteradas_clima:
+        # Os meses vizinhos entram só como contexto da interpolação e da imputação
+        contexto = sorted({vizinho for chave in alteradas_clima for vizinho in meses_vizinhos(chave)} & set(assinaturas_clima))
+        print(f"📎 Meses climáticos lidos como contexto: {sorted(set(contexto) - set(alteradas_clima))}")
+        dados_climaticos = ler_particoes_brutas(args.clima, 'Data', FORMATOS_CLIMA, contexto, args.chunksize)
+        dados_climaticos = tratar_base_climatica(
+            dados_climaticos, workers=args.workers, data_inicio=args.data_inicio, data_fim=args.data_fim
+        )
+        dados_climaticos, limites = normalizar_variaveis(dados_climaticos, manifesto['limites_normalizacao'])
+        avisar_vazias('clima', gravar_particoes(dados_climaticos, 'clima', 'Data', alteradas_clima))
+        manifesto['limites_normalizacao'] = limites
+        manifesto['clima'].update({chave: assinaturas_clima[chave] for chave in alteradas_clima})
+        salvar_manifesto(manifesto)
+
+    # 📌 2️⃣ Base operacional: tratar apenas os meses novos ou alterados
+    print(f"🔎 Calculando assinaturas mensais de `{args.operacional}`...")
+    assinaturas_oper = assinaturas_por_particao(args.operacional, 'data_servico', FORMATOS_OPERACIONAL, args.chunksize)
+    removidas_oper = remover_particoes_ausentes(manifesto, 'operacional', assinaturas_oper)
+    for chave in removidas_oper:
+        remover_particao_fusionada(chave)
+    if removidas_clima or removidas_oper:
+        salvar_manifesto(manifesto)
+    alteradas_oper = particoes_alteradas(assinaturas_oper, manifesto['operacional'])
+    print(f"✅ {len(alteradas_oper)} de {len(assinaturas_oper)} partições operacionais a processar: {alteradas_oper}")
+
+    if alteradas_oper:
+        referencia_localidades = referencia_localidades_em_blocos(args.operacional, args.chunksize)
+        dicionario = carregar_dicionario()
+        df_operacional = ler_particoes_brutas(
+            args.operacional, 'data_servico', FORMATOS_OPERACIONAL, alteradas_oper, args.chunksize,
+            usecols=colunas_mantidas(args.operacional)
+        )
+        df_operacional = tratar_bloco(
+            df_operacional, referencia_localidades, dicionario, carregar_indice_municipios(),
+            data_inicio=args.data_inicio, data_fim=args.data_fim
+        )
+        salvar_dicionario(dicionario)
+        avisar_vazias('operacional', gravar_particoes(df_operacional, 'operacional', 'data_servico', alteradas_oper))
+        manifesto['operacional'].update({chave: assinaturas_oper[chave] for chave in alteradas_oper})
+        salvar_manifesto(manifesto)
+
+    # 📌 3️⃣ Refundir os meses afetados e substituí-los no lugar na base fusionada
+    # Uma partição climática alterada também afeta as ocorrências dos meses vizinhos (tolerância da junção)
+    afetados = set(alteradas_oper)
+    for chave in alteradas_clima + removidas_clima:
+        afetados.update(meses_vizinhos(chave))
+    afetados = sorted(chave for chave in afetados if os.path.exists(_caminho_particao('operacional', chave)))
+    print(f"🔗 Refundindo {len(afetados)} meses: {afetados}")
+
+    for chave in afetados:
+        df_operacional = ler_particoes('operacional', [chave])
+        df_climatica = ler_particoes('clima', meses_vizinhos(chave))
+        if df_climatica is None:
+            # Sem clima não há fusão: a partição antiga (se houver) não pode continuar na base fusionada
+            remover_particao_fusionada(chave)
+            print(f"⚠️ Sem dados climáticos para {chave}; mês removido da base fusionada.")
+            continue
+        fundida = criar_variavel_alvo(fundir_por_estacao(df_operacional, df_climatica, tolerancia=args.tolerancia))
+        salvar_base_fusionada_parquet(fundida)
+        print(f"✅ {chave}: {len(fundida)} registros atualizados na base fusionada.")
+
+    # 📌 4️⃣ Regerar os artefatos derivados das bases tratadas (CSV, cubo e eventos extremos)
+    if alteradas_clima or removidas_clima:
+        print(f"💾 Regravando `{BASES_TRATADAS['clima']}`, o cubo climático e as tabelas de eventos...")
+        exportar_base_tratada('clima', BASES_TRATADAS['clima'])
+        df_climatica = ler_particoes('clima', sorted(manifesto['clima']))
+        if df_climatica is not None:
+            gravar_cubo(df_climatica)
+        # O cache de eventos é invalidado pela mudança do CSV e recalculado aqui
+        carregar_tabelas_eventos()
+    if alteradas_oper or removidas_oper:
+        print(f"💾 Regravando `{BASES_TRATADAS['operacional']}`...")
+        exportar_base_tratada('operacional', BASES_TRATADAS['operacional'])
+
+    print("✅ Ingestão incremental concluída!")
+
+
+# A proteção é necessária para que os processos do tratamento por estação não reexecutem o script
+if __name__ == "__main__":
+    main()
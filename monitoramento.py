@@ -0,0 +1,63 @@
+"""Registro de tempo e memória por etapa dos scripts de treinamento.
+
+Com `psutil` instalado, a memória é o RSS atual do processo e cada etapa
+informa também a variação durante o bloco. Sem `psutil`, só há o pico de
+memória do processo desde o início (`resource`, em sistemas Unix), que não
+permite calcular a variação de uma etapa: nesse caso é informado apenas o
+pico até o fim da etapa.
+"""
+import sys
+import time
+from contextlib import contextmanager
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+def memoria_mb():
+    """RSS atual do processo em MB, ou None sem `psutil`."""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss / 1024 ** 2
+    return None
+
+
+def pico_memoria_mb():
+    """Pico de memória do processo desde o início, em MB, ou None se não for possível medir."""
+    if resource is None:
+        return None
+    # ru_maxrss é informado em KB no Linux e em bytes no macOS
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico / 1024 ** 2 if sys.platform == "darwin" else pico / 1024
+
+
+@contextmanager
+def medir_etapa(nome, registro=None):
+    """Mede o tempo e a memória do bloco e imprime o resultado.
+
+    Se `registro` for uma lista, acrescenta um dicionário com as medidas da etapa.
+    """
+    memoria_inicial = memoria_mb()
+    inicio = time.perf_counter()
+    yield
+    duracao = time.perf_counter() - inicio
+    memoria_final = memoria_mb()
+
+    if memoria_final is not None:
+        tipo = "RSS"
+        print(f"⏱️ {nome}: {duracao:.1f}s | memória {memoria_final:.0f} MB ({memoria_final - memoria_inicial:+.0f} MB)")
+    else:
+        tipo = "pico até aqui"
+        memoria_final = pico_memoria_mb()
+        if memoria_final is None:
+            print(f"⏱️ {nome}: {duracao:.1f}s")
+        else:
+            print(f"⏱️ {nome}: {duracao:.1f}s | pico de memória até aqui {memoria_final:.0f} MB")
+    if registro is not None:
+        registro.append({'Etapa': nome, 'Tempo (s)': round(duracao, 2), 'Memória (MB)': memoria_final, 'Medida': tipo})
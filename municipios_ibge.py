@@ -0,0 +1,58 @@
+"""Atribuição do município IBGE (`NM_MUN`) a cada ocorrência por ponto-em-polígono.
+
+Os polígonos dos municípios (geometria original, sem simplificação, em WGS84)
+são indexados uma única vez em uma `shapely.STRtree`. As coordenadas são
+deduplicadas antes da consulta (muitas ocorrências repetem a mesma
+localização) e os pontos únicos são consultados em lotes com a busca
+vetorizada da árvore, sem nenhum laço Python por ponto. Pontos sobre a
+fronteira entre dois municípios ficam com o primeiro deles na camada.
+"""
+import numpy as np
+import shapely
+
+from camada_goias import carregar_camada_goias
+
+TAMANHO_LOTE = 1_000_000
+
+
+class IndiceMunicipios:
+    """Índice espacial dos municípios de Goiás para consultas em lote de (latitude, longitude)."""
+
+    def __init__(self, camada, coluna_nome="NM_MUN"):
+        self.nomes = camada[coluna_nome].to_numpy(dtype=object)
+        self.arvore = shapely.STRtree(np.asarray(camada.geometry.array))
+
+    @classmethod
+    def carregar(cls):
+        """Índice sobre a camada em cache com a geometria original (tolerância 0)."""
+        return cls(carregar_camada_goias(tolerancia=0))
+
+    def _indices(self, longitude, latitude):
+        """Posição do município na camada para cada ponto (-1 fora de Goiás)."""
+        resultado = np.full(len(longitude), -1, dtype=np.int64)
+        for inicio in range(0, len(longitude), TAMANHO_LOTE):
+            fim = inicio + TAMANHO_LOTE
+            pontos = shapely.points(longitude[inicio:fim], latitude[inicio:fim])
+            # `intersects` inclui os pontos exatamente sobre a fronteira
+            entrada, municipio = self.arvore.query(pontos, predicate="intersects")
+            ordem = np.lexsort((municipio, entrada))
+            entrada, municipio = entrada[ordem], municipio[ordem]
+            primeiros = np.unique(entrada, return_index=True)[1]
+            resultado[inicio + entrada[primeiros]] = municipio[primeiros]
+        return resultado
+
+    def municipios(self, latitude, longitude):
+        """`NM_MUN` de cada ponto (None para coordenadas ausentes ou fora de Goiás)."""
+        latitude = np.asarray(latitude, dtype=np.float64)
+        longitude = np.asarray(longitude, dtype=np.float64)
+        nomes = np.full(len(latitude), None, dtype=object)
+        validas = np.flatnonzero(np.isfinite(latitude) & np.isfinite(longitude))
+        if validas.size == 0:
+            return nomes
+
+        # Deduplicação das coordenadas: cada par (lon, lat) vira um número complexo
+        unicos, inverso = np.unique(longitude[validas] + 1j * latitude[validas], return_inverse=True)
+        indices = self._indices(unicos.real, unicos.imag)[inverso.ravel()]
+        encontrados = indices >= 0
+        nomes[validas[encontrados]] = self.nomes[indices[encontrados]]
+        return nomes
@@ -0,0 +1,99 @@
+"""Pacote único de inferência: scaler, modelo, lista de features e tipos.
+
+O script 3.6 grava, ao final do treinamento, um único arquivo
+`modelo_inferencia.joblib` com o scaler ajustado no mesmo treino do modelo.
+Os scripts de previsão carregam esse arquivo com uma única chamada
+(`joblib.load` com `mmap_mode`, sem compressão, para que os arrays NumPy
+sejam mapeados em memória em vez de copiados) e nunca precisam reajustar o
+scaler sobre a base fusionada.
+
+Junto com ele é gravado `modelo_inferencia_compacto.joblib`, idêntico mas com
+o Random Forest achatado em arrays contíguos (`floresta_compacta`), que é o
+preferido na carga: nenhuma árvore precisa ser recriada e os processos de
+previsão compartilham o modelo mapeado em memória.
+"""
+import os
+import time
+
+import joblib
+import sklearn
+
+from floresta_compacta import FlorestaCompacta
+
+CAMINHO_PACOTE = "modelo_inferencia.joblib"
+CAMINHO_PACOTE_COMPACTO = "modelo_inferencia_compacto.joblib"
+VERSAO_PACOTE = 1
+
+# Artefatos separados das versões anteriores do pipeline (3.6 + 3.7)
+CAMINHO_MODELO_LEGADO = "modelo_random_forest.joblib"
+CAMINHO_SCALER_LEGADO = "scaler.joblib"
+FEATURES_LEGADO = [
+    "PRECIPITAÇÃO TOTAL, HORÁRIO (mm)",
+    "TEMPERATURA DO AR - BULBO SECO, HORARIA (°C)",
+    "UMIDADE RELATIVA DO AR, HORARIA (%)",
+    "VENTO, VELOCIDADE HORARIA (m/s)",
+]
+
+
+def salvar_pacote(modelo, scaler, features, dtypes, metricas=None, caminho=CAMINHO_PACOTE,
+                  caminho_compacto=CAMINHO_PACOTE_COMPACTO):
+    """Grava o pacote de inferência (sem compressão, para permitir o mapeamento em memória).
+
+    Se `caminho_compacto` for informado, grava também a versão com a floresta compacta.
+    """
+    pacote = {
+        "versao": VERSAO_PACOTE,
+        "criado_em": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "sklearn": sklearn.__version__,
+        "features": list(features),
+        "dtypes": {coluna: str(dtypes[coluna]) for coluna in features},
+        "metricas": metricas or {},
+        "scaler": scaler,
+        "modelo": modelo,
+    }
+    joblib.dump(pacote, caminho)
+    if caminho_compacto:
+        joblib.dump({**pacote, "modelo": FlorestaCompacta.de_sklearn(modelo)}, caminho_compacto)
+    return caminho
+
+
+def carregar_pacote(caminho=None, mmap_mode="r"):
+    """Carrega o pacote de inferência com uma única chamada.
+
+    Sem `caminho`, usa o pacote compacto quando existir e, senão, o completo.
+    Se nenhum pacote existir, monta um equivalente a partir dos arquivos
+    legados `modelo_random_forest.joblib` e `scaler.joblib`.
+    """
+    if caminho is None:
+        caminho = CAMINHO_PACOTE_COMPACTO if os.path.exists(CAMINHO_PACOTE_COMPACTO) else CAMINHO_PACOTE
+    if not os.path.exists(caminho):
+        print(f"⚠️ `{caminho}` não encontrado, usando `{CAMINHO_MODELO_LEGADO}` e `{CAMINHO_SCALER_LEGADO}`...")
+        return {
+            "versao": 0,
+            "features": FEATURES_LEGADO,
+            "dtypes": {coluna: "float64" for coluna in FEATURES_LEGADO},
+            "metricas": {},
+            "scaler": joblib.load(CAMINHO_SCALER_LEGADO),
+            "modelo": joblib.load(CAMINHO_MODELO_LEGADO),
+        }
+
+    pacote = joblib.load(caminho, mmap_mode=mmap_mode)
+    if pacote.get("versao") != VERSAO_PACOTE:
+        raise ValueError(
+            f"Versão do pacote `{caminho}` ({pacote.get('versao')}) diferente da esperada ({VERSAO_PACOTE}). "
+            "Execute novamente o script 3.6."
+        )
+    if pacote["sklearn"] != sklearn.__version__:
+        print(f"⚠️ Pacote gerado com scikit-learn {pacote['sklearn']}, em uso {sklearn.__version__}.")
+    return pacote
+
+
+def preparar_entrada(pacote, df):
+    """Seleciona as features do pacote na ordem do treino, com os mesmos tipos, e aplica o scaler."""
+    X = df[pacote["features"]].astype(pacote["dtypes"])
+    return pacote["scaler"].transform(X)
+
+
+def prever(pacote, df):
+    """Previsões do modelo do pacote para as linhas de `df`."""
+    return pacote["modelo"].predict(preparar_entrada(pacote, df))
@@ -0,0 +1,327 @@
+"""Executor do pipeline de scripts numerados, com cache por hash de conteúdo.
+
+Cada etapa declara o script, os arquivos de entrada, os arquivos de saída e
+os argumentos de linha de comando. A dependência entre etapas é deduzida das
+próprias declarações: uma etapa depende de outra quando lê algum arquivo que
+a outra grava. A chave de cada etapa é o hash de:
+
+- conteúdo do script e dos módulos locais que ele importa (direta ou indiretamente);
+- conteúdo dos arquivos/pastas de entrada;
+- argumentos da etapa.
+
+Uma etapa é pulada quando a chave é igual à da última execução bem-sucedida
+(gravada em `pipeline_estado.json`) e todas as saídas existem. Etapas
+independentes (ex.: gráficos 2.x e treinamento 3.x) rodam em paralelo, cada
+uma em seu próprio processo, com a saída gravada em `logs_pipeline/<etapa>.log`.
+
+Uso:
+    python pipeline.py                 # executa tudo o que estiver desatualizado
+    python pipeline.py 3.8 2.4         # apenas essas etapas e as que elas precisam
+    python pipeline.py --listar        # mostra o estado de cada etapa sem executar
+    python pipeline.py --forcar 3.6    # reexecuta mesmo se estiver atualizada
+"""
+import argparse
+import ast
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+CAMINHO_ESTADO = os.path.join(RAIZ, 'pipeline_estado.json')
+PASTA_LOGS = os.path.join(RAIZ, 'logs_pipeline')
+
+FUSIONADA = 'base_fusionada_parquet'
+
+ETAPAS = {
+    '1.1': {
+        'script': '1.1_tratamento_base_clima.py',
+        'entradas': ['base_clima.csv'],
+        'saidas': ['base_climatica_tratada.csv', 'cubo_climatico'],
+    },
+    '1.2': {
+        'script': '1.2_tratamento_base_operacional.py',
+        'entradas': ['base_operacional.csv', 'cache_geo'],
+        'saidas': ['base_operacional_tratada.csv', 'dicionario_codigos.json'],
+        'argumentos': ['--streaming'],
+    },
+    'eventos': {
+        'script': 'eventos_extremos.py',
+        'entradas': ['base_climatica_tratada.csv'],
+        'saidas': ['cache_eventos'],
+    },
+    'camada_geo': {
+        'script': 'camada_goias.py',
+        'entradas': ['shapefile'],
+        'saidas': ['cache_geo'],
+    },
+    '1.3': {
+        'script': '1.3_eda_padroes.py',
+        'entradas': ['base_operacional_tratada.csv', 'cubo_climatico', 'cache_eventos'],
+        'saidas': ['histogramas_climaticos.png', 'grafico_dispersao_eventos_vs_ocorrencias.png',
+                   'mapa_calor_climatico.png', 'serie_temporal_eventos_extremos.png',
+                   'serie_temporal_ocorrencias.png'],
+    },
+    '2.1': {
+        'script': '2.1_grafico_evento_climatico.py',
+        'entradas': ['cache_eventos'],
+        'saidas': ['eventos_extremos_barras_com_legenda_e_caixa.png'],
+    },
+    '2.2': {
+        'script': '2.2_relacao_operacional_clima.py',
+        'entradas': ['base_operacional_tratada.csv', 'cache_eventos'],
+        'saidas': ['eventos_vs_ocorrencias_emergenciais.png'],
+    },
+    '2.3': {
+        'script': '2.3_outliers.py',
+        'entradas': ['base_operacional_tratada.csv', 'cache_eventos'],
+        'saidas': ['residuos_detalhados.csv', 'outliers_detalhados.csv',
+                   'grafico_dispersao_outliers_detalhados.png'],
+    },
+    '2.4': {
+        'script': '2.4_mapa_calor_operacional.py',
+        'entradas': ['base_operacional_tratada.csv', 'cache_geo'],
+        'saidas': ['mapa_calor_goias_com_municipios_e_marcadores.html'],
+    },
+    '2.5': {
+        'script': '2.5_mapa_calor_operacional_estacoes.py',
+        'entradas': ['base_operacional_tratada.csv', 'cache_geo'],
+        'saidas': ['mapa_calor_goias_com_estacoes_e_ajuste_regional.html'],
+    },
+    '3.1': {
+        'script': '3.1_preprocessamento_fusao.py',
+        'entradas': ['base_climatica_tratada.csv', 'base_operacional_tratada.csv'],
+        'saidas': ['base_fusionada.csv', FUSIONADA],
+    },
+    '3.2': {'script': '3.2_treinamento_testes_modelos.py', 'entradas': [FUSIONADA], 'saidas': []},
+    '3.3': {'script': '3.3_otimizacao_random_forest.py', 'entradas': [FUSIONADA], 'saidas': []},
+    '3.4': {'script': '3.4_balanceamento_do_modelo.py', 'entradas': [FUSIONADA], 'saidas': []},
+    '3.5': {'script': '3.5_balanceamento_avancado.py', 'entradas': [FUSIONADA], 'saidas': []},
+    '3.6': {
+        'script': '3.6_balanceamento_mais_avancado.py',
+        'entradas': [FUSIONADA],
+        'saidas': ['modelo_inferencia.joblib', 'modelo_inferencia_compacto.joblib'],
+    },
+    '3.7': {
+        'script': '3.7_salvar_scaler.py',
+        'entradas': ['modelo_inferencia.joblib'],
+        'saidas': ['scaler.joblib'],
+    },
+    '3.8': {
+        'script': '3.8_aplicacao_do_modelo_interpretacao.py',
+        'entradas': [FUSIONADA, 'modelo_inferencia_compacto.joblib'],
+        'saidas': ['3.8_previsoes_resultados.csv'],
+    },
+    'pontuacao': {
+        'script': 'pontuacao_lote.py',
+        'entradas': [FUSIONADA, 'modelo_inferencia_compacto.joblib'],
+        'saidas': ['previsoes_base_fusionada.parquet'],
+    },
+    '3.9': {
+        'script': '3.9_previsao_2025.py',
+        'entradas': ['modelo_inferencia_compacto.joblib'],
+        'saidas': ['3.9_previsoes_resultados.csv'],
+    },
+}
+
+
+def dependencias(etapas=ETAPAS):
+    """{etapa: conjunto de etapas que gravam algum arquivo lido por ela}."""
+    produtor = {saida: nome for nome, etapa in etapas.items() for saida in etapa['saidas']}
+    return {
+        nome: {produtor[entrada] for entrada in etapa['entradas'] if produtor.get(entrada, nome) != nome}
+        for nome, etapa in etapas.items()
+    }
+
+
+def modulos_locais(script, vistos=None):
+    """Módulos `.py` da raiz do projeto importados pelo script, de forma transitiva."""
+    vistos = set() if vistos is None else vistos
+    with open(os.path.join(RAIZ, script), encoding='utf-8') as arquivo:
+        arvore = ast.parse(arquivo.read(), filename=script)
+    for no in ast.walk(arvore):
+        if isinstance(no, ast.Import):
+            nomes = [alias.name for alias in no.names]
+        elif isinstance(no, ast.ImportFrom) and no.module and not no.level:
+            nomes = [no.module]
+        else:
+            continue
+        for nome in nomes:
+            modulo = f'{nome.split(".")[0]}.py'
+            if modulo not in vistos and os.path.exists(os.path.join(RAIZ, modulo)):
+                vistos.add(modulo)
+                modulos_locais(modulo, vistos)
+    return vistos
+
+
+class Hashes:
+    """Hash SHA-256 de arquivos e pastas, memorizado por (tamanho, mtime) entre execuções.
+
+    As bases brutas têm vários GB; o conteúdo só é relido quando o arquivo muda.
+    """
+
+    def __init__(self, memo):
+        self.memo = memo
+
+    def arquivo(self, caminho):
+        estado = os.stat(caminho)
+        assinatura = [estado.st_size, estado.st_mtime_ns]
+        registro = self.memo.get(caminho)
+        if registro and registro[:2] == assinatura:
+            return registro[2]
+        h = hashlib.sha256()
+        with open(caminho, 'rb') as arquivo:
+            for bloco in iter(lambda: arquivo.read(1 << 20), b''):
+                h.update(bloco)
+        self.memo[caminho] = assinatura + [h.hexdigest()]
+        return h.hexdigest()
+
+    def caminho(self, caminho):
+        """Hash de um arquivo ou de uma pasta (nomes relativos + conteúdo de cada arquivo)."""
+        completo = os.path.join(RAIZ, caminho)
+        if not os.path.exists(completo):
+            return None  # entrada ausente: a etapa será executada e acusará o erro
+        if not os.path.isdir(completo):
+            return self.arquivo(completo)
+        h = hashlib.sha256()
+        for pasta, subpastas, arquivos in os.walk(completo):
+            subpastas.sort()
+            for nome in sorted(arquivos):
+                arquivo = os.path.join(pasta, nome)
+                h.update(os.path.relpath(arquivo, completo).encode('utf-8'))
+                h.update(self.arquivo(arquivo).encode('ascii'))
+        return h.hexdigest()
+
+
+def chave_etapa(etapa, hashes):
+    """Hash do script, dos módulos locais, das entradas e dos argumentos da etapa."""
+    componentes = {
+        'codigo': {modulo: hashes.caminho(modulo) for modulo in sorted({etapa['script']} | modulos_locais(etapa['script']))},
+        'entradas': {entrada: hashes.caminho(entrada) for entrada in etapa['entradas']},
+        'argumentos': etapa.get('argumentos', []),
+    }
+    return hashlib.sha256(json.dumps(componentes, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def atualizada(nome, etapa, chave, estado):
+    registro = estado['etapas'].get(nome, {})
+    saidas_existem = all(os.path.exists(os.path.join(RAIZ, saida)) for saida in etapa['saidas'])
+    return registro.get('chave') == chave and saidas_existem
+
+
+def executar_etapa(nome, etapa):
+    """Roda o script em um processo próprio, sem janelas de gráfico, e grava o log da etapa."""
+    os.makedirs(PASTA_LOGS, exist_ok=True)
+    ambiente = dict(os.environ, MPLBACKEND='Agg', PYTHONIOENCODING='utf-8')
+    comando = [sys.executable, etapa['script'], *etapa.get('argumentos', [])]
+    inicio = time.perf_counter()
+    with open(os.path.join(PASTA_LOGS, f'{nome}.log'), 'w', encoding='utf-8') as log:
+        processo = subprocess.run(comando, cwd=RAIZ, env=ambiente, stdout=log, stderr=subprocess.STDOUT)
+    return processo.returncode, time.perf_counter() - inicio
+
+
+def carregar_estado(caminho=CAMINHO_ESTADO):
+    if not os.path.exists(caminho):
+        return {'etapas': {}, 'arquivos': {}}
+    with open(caminho, encoding='utf-8') as arquivo:
+        return json.load(arquivo)
+
+
+def salvar_estado(estado, caminho=CAMINHO_ESTADO):
+    temporario = f'{caminho}.tmp'
+    with open(temporario, 'w', encoding='utf-8') as arquivo:
+        json.dump(estado, arquivo, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(temporario, caminho)
+
+
+def selecionar(alvos, deps):
+    """As etapas pedidas e todas as etapas de que elas dependem."""
+    selecionadas, pendentes = set(), list(alvos)
+    while pendentes:
+        nome = pendentes.pop()
+        if nome not in selecionadas:
+            selecionadas.add(nome)
+            pendentes.extend(deps[nome])
+    return selecionadas
+
+
+def executar_pipeline(alvos=None, forcar=(), workers=2, listar=False):
+    """Executa as etapas desatualizadas respeitando as dependências. Retorna True se nenhuma falhou."""
+    deps = dependencias()
+    selecionadas = selecionar(alvos or ETAPAS, deps)
+    estado = carregar_estado()
+    hashes = Hashes(estado['arquivos'])
+
+    concluidas, falhas, desatualizadas, em_execucao = set(), set(), set(), {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while True:
+            # Etapas prontas: todas as dependências selecionadas já terminaram com sucesso
+            prontas = sorted(
+                nome for nome in selecionadas - concluidas - falhas - set(em_execucao.values())
+                if (deps[nome] & selecionadas) <= concluidas
+            )
+            for nome in prontas:
+                etapa = ETAPAS[nome]
+                chave = chave_etapa(etapa, hashes)
+                # No modo de listagem as entradas ainda não foram regeneradas: uma dependência
+                # desatualizada basta para marcar a etapa como desatualizada
+                if nome not in forcar and not (deps[nome] & desatualizadas) and atualizada(nome, etapa, chave, estado):
+                    print(f"⏭️ {nome} ({etapa['script']}) está atualizada.")
+                    concluidas.add(nome)
+                elif listar:
+                    print(f"🔸 {nome} ({etapa['script']}) precisa ser executada.")
+                    desatualizadas.add(nome)
+                    concluidas.add(nome)
+                else:
+                    print(f"▶️ Executando {nome} ({etapa['script']})...")
+                    em_execucao[executor.submit(executar_etapa, nome, etapa)] = nome
+                    estado['etapas'].setdefault(nome, {})['chave_pendente'] = chave
+
+            if not em_execucao:
+                if prontas:
+                    continue
+                break
+
+            terminadas, _ = wait(em_execucao, return_when=FIRST_COMPLETED)
+            for futuro in terminadas:
+                nome = em_execucao.pop(futuro)
+                codigo, duracao = futuro.result()
+                registro = estado['etapas'][nome]
+                chave = registro.pop('chave_pendente')
+                if codigo == 0:
+                    registro.update(chave=chave, duracao_s=round(duracao, 1), concluida_em=time.strftime('%Y-%m-%d %H:%M:%S'))
+                    concluidas.add(nome)
+                    print(f"✅ {nome} concluída em {duracao:.1f}s.")
+                else:
+                    falhas.add(nome)
+                    print(f"❌ {nome} falhou (código {codigo}); veja `logs_pipeline/{nome}.log`.")
+                salvar_estado(estado)
+
+    bloqueadas = selecionadas - concluidas - falhas
+    if bloqueadas:
+        print(f"⚠️ Etapas não executadas por falha em dependências: {sorted(bloqueadas)}")
+    if not listar:
+        salvar_estado(estado)
+    return not falhas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Executa os scripts do projeto pulando as etapas já atualizadas.")
+    parser.add_argument('alvos', nargs='*', help=f"Etapas desejadas (padrão: todas): {', '.join(ETAPAS)}.")
+    parser.add_argument('--forcar', nargs='*', default=[], choices=list(ETAPAS), help="Etapas a reexecutar mesmo se atualizadas.")
+    parser.add_argument('--workers', type=int, default=2, help="Número de etapas executadas ao mesmo tempo.")
+    parser.add_argument('--listar', action='store_true', help="Apenas mostra o que seria executado.")
+    args = parser.parse_args()
+    desconhecidas = set(args.alvos) - set(ETAPAS)
+    if desconhecidas:
+        parser.error(f"etapas desconhecidas: {sorted(desconhecidas)}")
+
+    sucesso = executar_pipeline(args.alvos, set(args.forcar), args.workers, args.listar)
+    sys.exit(0 if sucesso else 1)
+
+
+if __name__ == "__main__":
+    main()
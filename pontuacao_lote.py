@@ -0,0 +1,130 @@
+"""Pontuação em lote de toda a base fusionada (ou de novos arquivos mensais).
+
+Versão em escala do script 3.8: em vez de amostrar 100 linhas, a entrada é
+lida em lotes (somente as colunas necessárias), cada lote é pontuado em um
+pool de processos e as colunas `Previsao_Ocorrencia` e `Custo_Estimado` são
+gravadas incrementalmente em um único arquivo Parquet. Cada processo carrega
+o pacote de inferência uma única vez; com o pacote compacto, os arrays do
+modelo são mapeados em memória e compartilhados entre os processos.
+
+Uso:
+    python pontuacao_lote.py                                   # base fusionada inteira
+    python pontuacao_lote.py --entrada novos/2024-09.csv --saida previsoes_2024-09.parquet
+"""
+import argparse
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from base_colunar import CAMINHO_PARQUET_FUSIONADA
+from esquema_bases import aplicar_esquema
+from pacote_inferencia import carregar_pacote, prever
+
+CAMINHO_SAIDA = "previsoes_base_fusionada.parquet"
+
+# Colunas copiadas da entrada para a saída, quando presentes
+COLUNAS_IDENTIFICACAO = ["data_servico", "localidade", "tipo_servico", "des_atividade", "valor_unitario"]
+
+_pacote = None
+
+
+def _iniciar_processo():
+    global _pacote
+    _pacote = carregar_pacote()
+    # O paralelismo já é o do pool; um modelo do scikit-learn não deve abrir mais threads por processo
+    if hasattr(_pacote["modelo"], "n_jobs"):
+        _pacote["modelo"].n_jobs = 1
+
+
+def pontuar_lote(lote):
+    """Previsão e custo estimado de um lote; linhas com features ausentes ficam sem previsão."""
+    validas = lote[_pacote["features"]].notna().all(axis=1).to_numpy()
+    previsao = pd.Series(pd.NA, index=lote.index, dtype="Int8")
+    if validas.any():
+        previsao[validas] = prever(_pacote, lote[validas])
+
+    saida = lote.copy()
+    for coluna in saida.columns[saida.dtypes == "category"]:
+        saida[coluna] = saida[coluna].astype("string")
+    saida["Previsao_Ocorrencia"] = previsao
+    if "valor_unitario" in saida.columns:
+        saida["Custo_Estimado"] = previsao.astype("float64") * saida["valor_unitario"].astype("float64")
+    else:
+        saida["Custo_Estimado"] = float("nan")
+    return saida
+
+
+def lotes_entrada(caminho, colunas, tamanho_lote):
+    """Lê `caminho` (pasta/arquivo Parquet ou CSV com `;`) em lotes, apenas com as `colunas` existentes."""
+    if caminho.endswith(".csv"):
+        cabecalho = pd.read_csv(caminho, delimiter=";", encoding="utf-8", nrows=0).columns
+        usecols = [coluna for coluna in colunas if coluna in cabecalho]
+        for bloco in pd.read_csv(caminho, delimiter=";", encoding="utf-8", usecols=usecols, chunksize=tamanho_lote):
+            yield aplicar_esquema(bloco, "fusionada")
+        return
+
+    import pyarrow.dataset as ds
+
+    dataset = ds.dataset(caminho, format="parquet", partitioning="hive")
+    presentes = [coluna for coluna in colunas if coluna in dataset.schema.names]
+    for lote in dataset.to_batches(columns=presentes, batch_size=tamanho_lote):
+        yield lote.to_pandas()
+
+
+def pontuar_base(entrada, saida, tamanho_lote=200_000, workers=None):
+    """Pontua `entrada` inteira e grava o resultado em `saida`. Retorna o total de linhas."""
+    features = carregar_pacote()["features"]
+    colunas = list(dict.fromkeys(COLUNAS_IDENTIFICACAO + features))
+    workers = workers or os.cpu_count()
+
+    inicio = time.perf_counter()
+    total = 0
+    escritor = None
+    temporario = f"{saida}.tmp"
+    # Poucos lotes em voo por processo: a memória fica limitada e a ordem das linhas é mantida
+    pendentes = deque()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_iniciar_processo) as executor:
+        lotes = lotes_entrada(entrada, colunas, tamanho_lote)
+        while True:
+            while len(pendentes) < 2 * workers:
+                lote = next(lotes, None)
+                if lote is None:
+                    break
+                pendentes.append(executor.submit(pontuar_lote, lote))
+            if not pendentes:
+                break
+
+            tabela = pa.Table.from_pandas(pendentes.popleft().result(), preserve_index=False)
+            if escritor is None:
+                escritor = pq.ParquetWriter(temporario, tabela.schema)
+            escritor.write_table(tabela.cast(escritor.schema))
+            total += tabela.num_rows
+            decorrido = time.perf_counter() - inicio
+            print(f"⏳ {total} linhas pontuadas ({total / decorrido:,.0f} linhas/s)")
+
+    if escritor is not None:
+        escritor.close()
+        os.replace(temporario, saida)
+    decorrido = time.perf_counter() - inicio
+    print(f"✅ {total} linhas pontuadas em {decorrido:.1f}s ({total / max(decorrido, 1e-9):,.0f} linhas/s) → `{saida}`")
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pontua em lote a base fusionada com o pacote de inferência.")
+    parser.add_argument("--entrada", default=CAMINHO_PARQUET_FUSIONADA, help="Pasta/arquivo Parquet ou CSV a pontuar.")
+    parser.add_argument("--saida", default=CAMINHO_SAIDA, help="Arquivo Parquet de saída.")
+    parser.add_argument("--tamanho-lote", type=int, default=200_000, help="Linhas por lote.")
+    parser.add_argument("--workers", type=int, default=None, help="Processos de pontuação (padrão: todos os núcleos).")
+    args = parser.parse_args()
+
+    pontuar_base(args.entrada, args.saida, args.tamanho_lote, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""Reamostragem da família SMOTE com índice de vizinhos plugável.
+
+Os objetos devolvidos são os próprios `SMOTE`, `SMOTETomek` e `SMOTEENN` do
+imblearn (mesma API `fit_resample`), mas todas as buscas de vizinhos passam
+por `IndiceVizinhos`, que pode usar:
+
+- `"kdtree"`: `scipy.spatial.cKDTree`, com as consultas distribuídas entre
+  `n_jobs` núcleos pelo próprio cKDTree (código C, sem o GIL);
+- `"forca_bruta"`: distâncias em blocos com NumPy, com os blocos de consulta
+  distribuídos entre processos pelo joblib e memória limitada por bloco.
+
+Com apenas quatro variáveis a árvore é muito mais rápida que a busca padrão.
+"""
+import numpy as np
+from joblib import Parallel, delayed, effective_n_jobs
+from scipy.sparse import csr_matrix
+from scipy.spatial import cKDTree
+from sklearn.base import BaseEstimator
+from imblearn.combine import SMOTEENN, SMOTETomek
+from imblearn.over_sampling import SMOTE
+from imblearn.under_sampling import EditedNearestNeighbours, TomekLinks
+
+METODOS = ("kdtree", "forca_bruta")
+
+# Elementos float64 da matriz de distâncias de um bloco da força bruta (~64 MB)
+ELEMENTOS_POR_BLOCO = 8_000_000
+
+
+def _vizinhos_forca_bruta(consulta, referencia, normas_referencia, k):
+    d2 = (consulta ** 2).sum(axis=1)[:, None] - 2 * consulta @ referencia.T + normas_referencia[None, :]
+    indices = np.argpartition(d2, k - 1, axis=1)[:, :k] if k < d2.shape[1] else np.tile(np.arange(d2.shape[1]), (len(d2), 1))
+    distancias = np.take_along_axis(d2, indices, axis=1)
+    ordem = np.argsort(distancias, axis=1)
+    indices = np.take_along_axis(indices, ordem, axis=1)
+    distancias = np.sqrt(np.maximum(np.take_along_axis(distancias, ordem, axis=1), 0))
+    return distancias, indices
+
+
+class IndiceVizinhos(BaseEstimator):
+    """Busca de k vizinhos mais próximos compatível com os parâmetros `k_neighbors`/`n_neighbors` do imblearn."""
+
+    def __init__(self, n_neighbors=5, metodo="kdtree", n_jobs=None):
+        self.n_neighbors = n_neighbors
+        self.metodo = metodo
+        self.n_jobs = n_jobs
+
+    def fit(self, X, y=None):
+        if self.metodo not in METODOS:
+            raise ValueError(f"metodo deve ser um de {METODOS}, recebido {self.metodo!r}.")
+        self._X = np.ascontiguousarray(X, dtype=np.float64)
+        if self.metodo == "kdtree":
+            self._arvore = cKDTree(self._X)
+        else:
+            self._normas = (self._X ** 2).sum(axis=1)
+        return self
+
+    def kneighbors(self, X=None, n_neighbors=None, return_distance=True):
+        k = n_neighbors or self.n_neighbors
+        # Como no scikit-learn, sem X a consulta é a própria base de ajuste, excluindo o próprio ponto
+        proprio = X is None
+        consulta = self._X if proprio else np.ascontiguousarray(X, dtype=np.float64)
+        k_busca = min(k + proprio, len(self._X))
+
+        if self.metodo == "kdtree":
+            workers = effective_n_jobs(self.n_jobs)
+            distancias, indices = self._arvore.query(consulta, k=k_busca, workers=workers)
+            distancias = distancias.reshape(len(consulta), k_busca)
+            indices = indices.reshape(len(consulta), k_busca)
+        else:
+            linhas = max(1, ELEMENTOS_POR_BLOCO // len(self._X))
+            blocos = Parallel(n_jobs=self.n_jobs)(
+                delayed(_vizinhos_forca_bruta)(consulta[inicio:inicio + linhas], self._X, self._normas, k_busca)
+                for inicio in range(0, len(consulta), linhas)
+            )
+            distancias = np.vstack([bloco[0] for bloco in blocos])
+            indices = np.vstack([bloco[1] for bloco in blocos])
+
+        if proprio:
+            # Com pontos duplicados o próprio ponto nem sempre vem na primeira coluna (empate na
+            # distância zero): remove-se a entrada igual ao próprio índice e, nas linhas em que ele
+            # não foi devolvido, a coluna mais distante
+            mascara = indices != np.arange(len(consulta))[:, None]
+            mascara[mascara.all(axis=1), -1] = False
+            distancias = distancias[mascara].reshape(len(consulta), k_busca - 1)
+            indices = indices[mascara].reshape(len(consulta), k_busca - 1)
+        return (distancias, indices) if return_distance else indices
+
+    def kneighbors_graph(self, X=None, n_neighbors=None, mode="connectivity"):
+        distancias, indices = self.kneighbors(X, n_neighbors)
+        n_consultas, k = indices.shape
+        valores = np.ones(indices.size) if mode == "connectivity" else distancias.ravel()
+        return csr_matrix(
+            (valores, indices.ravel(), np.arange(0, n_consultas * k + 1, k)),
+            shape=(n_consultas, len(self._X)),
+        )
+
+
+class TomekLinksIndexado(TomekLinks):
+    """`TomekLinks` que localiza o vizinho mais próximo com `IndiceVizinhos`."""
+
+    _parameter_constraints = {**TomekLinks._parameter_constraints, "metodo": [str]}
+
+    def __init__(self, *, sampling_strategy="auto", n_jobs=None, metodo="kdtree"):
+        super().__init__(sampling_strategy=sampling_strategy, n_jobs=n_jobs)
+        self.metodo = metodo
+
+    def _fit_resample(self, X, y):
+        indice = IndiceVizinhos(n_neighbors=1, metodo=self.metodo, n_jobs=self.n_jobs).fit(X)
+        vizinho = indice.kneighbors(return_distance=False)[:, 0]
+        links = self.is_tomek(y, vizinho, self.sampling_strategy_)
+        self.sample_indices_ = np.flatnonzero(np.logical_not(links))
+        return X[self.sample_indices_], np.asarray(y)[self.sample_indices_]
+
+
+def criar_smote(sampling_strategy="auto", random_state=None, k_neighbors=5, metodo="kdtree", n_jobs=-1):
+    """`SMOTE` cujas buscas de vizinhos usam `IndiceVizinhos`."""
+    # O SMOTE consulta k + 1 vizinhos (o primeiro é o próprio ponto)
+    indice = IndiceVizinhos(n_neighbors=k_neighbors + 1, metodo=metodo, n_jobs=n_jobs)
+    return SMOTE(sampling_strategy=sampling_strategy, random_state=random_state, k_neighbors=indice)
+
+
+def criar_smote_tomek(sampling_strategy="auto", random_state=None, k_neighbors=5, metodo="kdtree", n_jobs=-1):
+    """`SMOTETomek` com SMOTE e Tomek links apoiados em `IndiceVizinhos`."""
+    return SMOTETomek(
+        random_state=random_state,
+        smote=criar_smote(sampling_strategy, random_state, k_neighbors, metodo, n_jobs),
+        tomek=TomekLinksIndexado(sampling_strategy="all", n_jobs=n_jobs, metodo=metodo),
+    )
+
+
+def criar_smote_enn(sampling_strategy="auto", random_state=None, k_neighbors=5, n_neighbors_enn=3,
+                    metodo="kdtree", n_jobs=-1):
+    """`SMOTEENN` com SMOTE e Edited Nearest Neighbours apoiados em `IndiceVizinhos`."""
+    indice_enn = IndiceVizinhos(n_neighbors=n_neighbors_enn + 1, metodo=metodo, n_jobs=n_jobs)
+    return SMOTEENN(
+        random_state=random_state,
+        smote=criar_smote(sampling_strategy, random_state, k_neighbors, metodo, n_jobs),
+        enn=EditedNearestNeighbours(sampling_strategy="all", n_neighbors=indice_enn),
+    )
@@ -0,0 +1,235 @@
+"""Serviço HTTP local de previsão, apenas com a biblioteca padrão (asyncio).
+
+O pacote de inferência é carregado uma única vez. Requisições simultâneas são
+agrupadas em micro-lotes: o primeiro pedido que chega abre uma janela de
+alguns milissegundos, e todos os pedidos recebidos nessa janela (até
+`lote_maximo` linhas) são respondidos por uma única chamada ao modelo,
+executada em uma thread para não bloquear o laço de eventos.
+
+Rotas:
+- `POST /prever`: corpo JSON com um objeto ou uma lista de objetos contendo
+  as features do modelo e, opcionalmente, `valor_unitario`. Responde, para
+  cada linha, `Previsao_Ocorrencia`, `Probabilidade_Ocorrencia` e `Custo_Estimado`;
+- `GET /metricas`: número de requisições e de lotes, tamanho médio dos lotes e
+  latências p50/p99 (ms) das últimas requisições;
+- `GET /saude`: versão e features do pacote carregado.
+
+Uso: `python servico_previsao.py [--porta 8008]`.
+"""
+import argparse
+import asyncio
+import json
+import math
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from pacote_inferencia import carregar_pacote, preparar_entrada
+
+STATUS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}
+
+
+class ServicoPrevisao:
+    def __init__(self, pacote, janela_ms=5, lote_maximo=1024, historico_latencias=10_000):
+        self.pacote = pacote
+        self.janela = janela_ms / 1000
+        self.lote_maximo = lote_maximo
+        self.fila = asyncio.Queue()
+        self.latencias = deque(maxlen=historico_latencias)
+        self.requisicoes = 0
+        self.lotes = 0
+        self.linhas = 0
+
+    # ----- Micro-lotes -----
+
+    async def prever(self, linhas):
+        """Enfileira as linhas e aguarda o resultado do micro-lote em que forem incluídas."""
+        futuro = asyncio.get_running_loop().create_future()
+        await self.fila.put((linhas, futuro))
+        return await futuro
+
+    async def processar_lotes(self):
+        laco = asyncio.get_running_loop()
+        while True:
+            pedidos = [await self.fila.get()]
+            n_linhas = len(pedidos[0][0])
+            limite = laco.time() + self.janela
+            while n_linhas < self.lote_maximo:
+                restante = limite - laco.time()
+                if restante <= 0:
+                    break
+                try:
+                    pedido = await asyncio.wait_for(self.fila.get(), restante)
+                except asyncio.TimeoutError:
+                    break
+                pedidos.append(pedido)
+                n_linhas += len(pedido[0])
+
+            linhas = [linha for pedido, _ in pedidos for linha in pedido]
+            try:
+                resultados = await laco.run_in_executor(None, self._prever_lote, linhas)
+            except Exception as erro:  # o erro é devolvido a cada requisição do lote
+                for _, futuro in pedidos:
+                    if not futuro.done():
+                        futuro.set_exception(erro)
+                continue
+
+            self.lotes += 1
+            self.linhas += len(linhas)
+            inicio = 0
+            for pedido, futuro in pedidos:
+                # A conexão pode ter sido encerrada enquanto o lote era processado
+                if not futuro.done():
+                    futuro.set_result(resultados[inicio:inicio + len(pedido)])
+                inicio += len(pedido)
+
+    def _prever_lote(self, linhas):
+        """Uma única chamada ao modelo para todas as linhas do micro-lote."""
+        df = pd.DataFrame(linhas)
+        modelo = self.pacote["modelo"]
+        probabilidades = modelo.predict_proba(preparar_entrada(self.pacote, df))
+        previsoes = modelo.classes_.take(np.argmax(probabilidades, axis=1))
+        positiva = list(modelo.classes_).index(1) if 1 in modelo.classes_ else -1
+        valor = pd.to_numeric(df["valor_unitario"], errors="coerce") if "valor_unitario" in df else pd.Series(np.nan, index=df.index)
+
+        resultados = []
+        for previsao, probabilidade, valor_unitario in zip(previsoes, probabilidades[:, positiva], valor):
+            custo = float(previsao) * valor_unitario
+            resultados.append({
+                "Previsao_Ocorrencia": int(previsao),
+                "Probabilidade_Ocorrencia": round(float(probabilidade), 6),
+                "Custo_Estimado": None if np.isnan(custo) else round(custo, 2),
+            })
+        return resultados
+
+    def validar(self, linhas):
+        """Mensagem de erro se alguma linha não tiver todas as features numéricas e finitas; None se estiver tudo certo.
+
+        NaN e ±Infinity (aceitos pelo `json` do Python) são recusados aqui: no modelo eles derrubariam o
+        micro-lote inteiro, inclusive as requisições válidas de outros clientes.
+        """
+        if not linhas or not all(isinstance(linha, dict) for linha in linhas):
+            return "Envie um objeto ou uma lista de objetos com as features."
+        for posicao, linha in enumerate(linhas):
+            invalidas = [
+                coluna for coluna in self.pacote["features"]
+                if isinstance(linha.get(coluna), bool) or not isinstance(linha.get(coluna), (int, float))
+                or not math.isfinite(linha[coluna])
+            ]
+            if invalidas:
+                return f"Linha {posicao}: features ausentes, não numéricas ou não finitas: {invalidas}"
+        return None
+
+    # ----- Métricas -----
+
+    def metricas(self):
+        latencias = np.asarray(self.latencias)
+        p50, p99 = np.percentile(latencias, [50, 99]) if len(latencias) else (None, None)
+        return {
+            "requisicoes": self.requisicoes,
+            "lotes": self.lotes,
+            "linhas": self.linhas,
+            "linhas_por_lote": round(self.linhas / self.lotes, 2) if self.lotes else None,
+            "latencia_ms": {
+                "p50": None if p50 is None else round(float(p50), 3),
+                "p99": None if p99 is None else round(float(p99), 3),
+                "amostras": len(latencias),
+            },
+        }
+
+    # ----- HTTP -----
+
+    async def responder(self, metodo, rota, corpo):
+        if rota == "/prever":
+            if metodo != "POST":
+                return 405, {"erro": "Use POST."}
+            try:
+                dados = json.loads(corpo or b"null")
+            except json.JSONDecodeError as erro:
+                return 400, {"erro": f"JSON inválido: {erro}"}
+            linhas = dados if isinstance(dados, list) else [dados]
+            # Validação antes do enfileiramento, para que uma linha inválida não derrube o lote dos outros clientes
+            erro = self.validar(linhas)
+            if erro:
+                return 400, {"erro": erro}
+            return 200, {"previsoes": await self.prever(linhas)}
+        if rota == "/metricas":
+            return 200, self.metricas()
+        if rota == "/saude":
+            return 200, {"versao": self.pacote["versao"], "features": self.pacote["features"]}
+        return 404, {"erro": f"Rota desconhecida: {rota}"}
+
+    async def atender(self, leitor, escritor):
+        """Atende uma conexão HTTP/1.1 (com keep-alive) até o cliente encerrá-la."""
+        try:
+            while True:
+                linha = await leitor.readline()
+                if not linha:
+                    break
+                inicio = time.perf_counter()
+                metodo, rota, _ = linha.decode("latin-1").split(" ", 2)
+
+                cabecalhos = {}
+                while (linha := await leitor.readline()) not in (b"\r\n", b"\n", b""):
+                    nome, _, valor = linha.decode("latin-1").partition(":")
+                    cabecalhos[nome.strip().lower()] = valor.strip()
+                tamanho = int(cabecalhos.get("content-length", 0))
+                corpo = await leitor.readexactly(tamanho) if tamanho else b""
+
+                try:
+                    status, resposta = await self.responder(metodo, rota.split("?", 1)[0], corpo)
+                except Exception as erro:
+                    status, resposta = 500, {"erro": str(erro)}
+
+                conteudo = json.dumps(resposta, ensure_ascii=False).encode("utf-8")
+                manter = cabecalhos.get("connection", "").lower() != "close"
+                escritor.write(
+                    f"HTTP/1.1 {status} {STATUS[status]}\r\n"
+                    f"Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(conteudo)}\r\n"
+                    f"Connection: {'keep-alive' if manter else 'close'}\r\n\r\n".encode("latin-1") + conteudo
+                )
+                await escritor.drain()
+
+                if rota.startswith("/prever"):
+                    self.requisicoes += 1
+                    self.latencias.append((time.perf_counter() - inicio) * 1000)
+                if not manter:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            escritor.close()
+
+
+async def servir(host, porta, janela_ms, lote_maximo):
+    pacote = carregar_pacote()
+    servico = ServicoPrevisao(pacote, janela_ms=janela_ms, lote_maximo=lote_maximo)
+    tarefa_lotes = asyncio.create_task(servico.processar_lotes())
+    servidor = await asyncio.start_server(servico.atender, host, porta)
+    print(f"🚀 Serviço de previsão em http://{host}:{porta} (features: {pacote['features']})")
+    try:
+        async with servidor:
+            await servidor.serve_forever()
+    finally:
+        tarefa_lotes.cancel()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serviço HTTP local de previsão de ocorrências e custos.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8008)
+    parser.add_argument("--janela-ms", type=float, default=5, help="Tempo máximo de espera para formar um micro-lote.")
+    parser.add_argument("--lote-maximo", type=int, default=1024, help="Linhas máximas por micro-lote.")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(servir(args.host, args.porta, args.janela_ms, args.lote_maximo))
+    except KeyboardInterrupt:
+        print("\n🛑 Serviço encerrado.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""Tratamento da base climática, usado pelo script 1.1 e pela ingestão incremental.
+
+Cada estação (`ESTACAO`) é ordenada por `Data_Hora`, convertida para valores
+numéricos e interpolada no tempo de forma independente, em um processo
+próprio, para que a interpolação nunca atravesse a fronteira entre estações.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+from sklearn.preprocessing import MinMaxScaler
+
+from conversao_datas import FORMATOS_CLIMA, converter_datas, montar_data_hora, formatar_hora
+from coordenadas import converter_coordenada, arredondar_coordenada
+from imputacao_climatica import imputar_em_lote
+
+DATA_INICIO = pd.Timestamp('2021-01-01')
+DATA_FIM = pd.Timestamp('2024-08-31')
+
+PRECIPITACAO = 'PRECIPITAÇÃO TOTAL, HORÁRIO (mm)'
+
+# Variáveis contínuas que passam pela imputação por modelo preditivo e pela normalização
+VARIAVEIS_CONTINUAS = [
+    'PRECIPITAÇÃO TOTAL, HORÁRIO (mm)',
+    'PRESSAO ATMOSFERICA AO NIVEL DA ESTACAO, HORARIA (mB)',
+    'RADIACAO GLOBAL (Kj/m²)',
+    'TEMPERATURA DO AR - BULBO SECO, HORARIA (°C)',
+    'UMIDADE RELATIVA DO AR, HORARIA (%)'
+]
+
+# Todas as leituras reais da estação (vírgula como separador decimal na base bruta)
+COLUNAS_REAIS = [
+    'PRECIPITAÇÃO TOTAL, HORÁRIO (mm)',
+    'PRESSAO ATMOSFERICA AO NIVEL DA ESTACAO, HORARIA (mB)',
+    'PRESSÃO ATMOSFERICA MAX.NA HORA ANT. (AUT) (mB)',
+    'PRESSÃO ATMOSFERICA MIN. NA HORA ANT. (AUT) (mB)',
+    'RADIACAO GLOBAL (Kj/m²)',
+    'TEMPERATURA DO AR - BULBO SECO, HORARIA (°C)',
+    'TEMPERATURA DO PONTO DE ORVALHO (°C)',
+    'TEMPERATURA MÁXIMA NA HORA ANT. (AUT) (°C)',
+    'TEMPERATURA MÍNIMA NA HORA ANT. (AUT) (°C)',
+    'TEMPERATURA ORVALHO MAX. NA HORA ANT. (AUT) (°C)',
+    'TEMPERATURA ORVALHO MIN. NA HORA ANT. (AUT) (°C)',
+    'UMIDADE REL. MAX. NA HORA ANT. (AUT) (%)',
+    'UMIDADE REL. MIN. NA HORA ANT. (AUT) (%)',
+    'UMIDADE RELATIVA DO AR, HORARIA (%)',
+    'VENTO, DIREÇÃO HORARIA (gr) (° (gr))',
+    'VENTO, RAJADA MAXIMA (m/s)',
+    'VENTO, VELOCIDADE HORARIA (m/s)'
+]
+
+
+def converter_reais(df):
+    """Troca a vírgula decimal por ponto e converte as leituras para float."""
+    for coluna in COLUNAS_REAIS:
+        if coluna in df.columns and not pd.api.types.is_numeric_dtype(df[coluna]):
+            df[coluna] = pd.to_numeric(
+                df[coluna].astype(str).str.replace(',', '.', regex=False), errors='coerce'
+            )
+    return df
+
+
+def tratar_estacao(df_estacao):
+    """Ordena a série de uma estação por `Data_Hora` e interpola as leituras no tempo."""
+    df_estacao = df_estacao.dropna(subset=['Data_Hora']).sort_values('Data_Hora')
+    df_estacao = converter_reais(df_estacao)
+
+    # Ausência de valor de precipitação implica ausência de precipitação
+    if PRECIPITACAO in df_estacao.columns:
+        df_estacao[PRECIPITACAO] = df_estacao[PRECIPITACAO].fillna(0)
+
+    colunas = [coluna for coluna in COLUNAS_REAIS if coluna in df_estacao.columns]
+    df_estacao[colunas] = (
+        df_estacao.set_index('Data_Hora')[colunas]
+        .interpolate(method='time')
+        .to_numpy()
+    )
+    return df_estacao
+
+
+def tratar_estacoes_em_paralelo(df, workers=None):
+    """Trata cada estação em um processo separado e concatena o resultado."""
+    grupos = [grupo for _, grupo in df.groupby('ESTACAO', sort=True)]
+    workers = min(workers or os.cpu_count() or 1, len(grupos)) or 1
+    if workers == 1:
+        tratados = [tratar_estacao(grupo) for grupo in grupos]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            tratados = list(executor.map(tratar_estacao, grupos))
+    return pd.concat(tratados, ignore_index=True)
+
+
+def tratar_base_climatica(dados_climaticos, workers=None, max_amostras_imputacao=None,
+                          data_inicio=DATA_INICIO, data_fim=DATA_FIM):
+    """Aplica as Etapas 2 a 6 do script 1.1 e devolve a base ainda sem as colunas normalizadas.
+
+    O período mantido vai de `data_inicio` a `data_fim` (None = sem limite).
+    """
+    # Etapa 2: Limpeza dos dados
+    # Remove duplicatas para garantir que os dados sejam únicos
+    dados_climaticos = dados_climaticos.drop_duplicates()
+    print("\nDuplicatas removidas com sucesso.")
+
+    # Ajuste de formato para LATITUDE e LONGITUDE
+    # Vírgulas viram pontos e os valores são mantidos como float com 6 casas decimais
+    for coluna in ['LATITUDE', 'LONGITUDE']:
+        if coluna in dados_climaticos.columns:
+            dados_climaticos[coluna] = arredondar_coordenada(converter_coordenada(dados_climaticos[coluna]))
+
+    # Remove valores fora do intervalo aceitável para latitude (-90 a 90) e longitude (-180 a 180)
+    dados_climaticos = dados_climaticos[
+        dados_climaticos['LATITUDE'].between(-90, 90) & dados_climaticos['LONGITUDE'].between(-180, 180)
+    ].copy()
+
+    # Conversão da coluna 'Data' para o formato datetime com formatos explícitos
+    # Permite manipulação e análises temporais
+    dados_climaticos['Data'] = converter_datas(dados_climaticos['Data'], FORMATOS_CLIMA)
+
+    # Etapa de filtro: Manter apenas os dados do período de estudo (por padrão, entre 01/01/2021 e 31/08/2024)
+    manter = dados_climaticos['Data'].notna()
+    if data_inicio is not None:
+        manter &= dados_climaticos['Data'] >= data_inicio
+    if data_fim is not None:
+        manter &= dados_climaticos['Data'] <= data_fim
+    dados_climaticos = dados_climaticos[manter].copy()
+    print("\nFiltro por intervalo de datas aplicado com sucesso.")
+
+    # Criação de uma nova coluna 'Data_Hora' somando à data o horário HHMM de 'Hora UTC'
+    # e ajuste da coluna 'Hora UTC' para o formato hh:mm:ss
+    dados_climaticos['Data_Hora'] = montar_data_hora(dados_climaticos['Data'], dados_climaticos['Hora UTC'])
+    dados_climaticos['Hora UTC'] = formatar_hora(dados_climaticos['Hora UTC'])
+    print("\nConversão de datas e horas realizada com sucesso.")
+
+    # Etapa 3: Tratamento por estação
+    # Cada estação é ordenada por 'Data_Hora' e tratada em um processo próprio: conversão de
+    # vírgulas para pontos, precipitação ausente preenchida com 0 (ausência de valor implica
+    # ausência de precipitação) e interpolação no tempo, sem atravessar a fronteira entre estações
+    dados_climaticos = tratar_estacoes_em_paralelo(dados_climaticos, workers=workers)
+    print("\nValores ausentes tratados com interpolação temporal por estação.")
+
+    # Etapa 5: Preenchimento usando modelo preditivo
+    # Substitui valores ausentes com predições baseadas em regressão para cada variável contínua.
+    # Todas as colunas são imputadas em lote: a matriz de preditores é montada uma única vez,
+    # compartilhada entre os processos, e os modelos de cada coluna são ajustados em paralelo
+    tempos_imputacao = imputar_em_lote(
+        dados_climaticos, VARIAVEIS_CONTINUAS, n_jobs=-1, max_amostras_treino=max_amostras_imputacao
+    )
+    print(f"\nImputação concluída para {len(tempos_imputacao)} variáveis em {sum(tempos_imputacao.values()):.2f}s de ajuste.")
+
+    # Remove qualquer linha restante com valores nulos após todas as etapas
+    dados_climaticos.dropna(inplace=True)
+    print(f"\nNúmero de linhas após remoção de valores nulos: {len(dados_climaticos)}")
+
+    # Etapa 6: Ajustar valores reais para 1 casa decimal
+    # Aplica para as variáveis contínuas, mantendo consistência nos dados
+    for coluna in COLUNAS_REAIS:
+        if coluna in dados_climaticos.columns:
+            dados_climaticos[coluna] = dados_climaticos[coluna].astype(float).round(1)
+    return dados_climaticos
+
+
+def normalizar_variaveis(dados_climaticos, limites=None):
+    """Etapa 7: cria as colunas `<variável>_normalizada` no intervalo [0, 1] (Min-Max Scaling).
+
+    Sem `limites`, o mínimo e o máximo de cada variável são calculados sobre os
+    próprios dados; com `limites` ({variável: [mínimo, máximo]}), são reaproveitados
+    os de uma execução anterior. Devolve a base e os limites usados.
+    """
+    limites = dict(limites or {})
+    for coluna in VARIAVEIS_CONTINUAS:
+        if coluna in dados_climaticos.columns:
+            scaler = MinMaxScaler()
+            if coluna in limites:
+                scaler.fit([[limites[coluna][0]], [limites[coluna][1]]])
+            else:
+                scaler.fit(dados_climaticos[[coluna]])
+                limites[coluna] = [float(scaler.data_min_[0]), float(scaler.data_max_[0])]
+            # Cria uma nova coluna para armazenar os valores normalizados
+            dados_climaticos[f"{coluna}_normalizada"] = scaler.transform(
+                dados_climaticos[[coluna]]
+            ).round(6)  # Arredonda os valores normalizados para 6 casas decimais
+    return dados_climaticos, limites
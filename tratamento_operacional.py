@@ -0,0 +1,166 @@
+"""Etapas de tratamento da base operacional usadas pelo script 1.2.
+
+Cada etapa recebe e devolve um DataFrame, de modo que possa ser aplicada
+tanto à base inteira quanto a cada bloco (chunk) no modo streaming.
+"""
+import pandas as pd
+
+from conversao_datas import FORMATOS_OPERACIONAL, converter_datas
+from dicionario_codigos import atualizar_dicionario, codificar
+from coordenadas import (
+    converter_coordenada, preencher_por_localidade, arredondar_coordenada, referencia_por_localidade
+)
+
+COLUNAS_REMOVIDAS = [
+    'Contrato', 'cod_equipe', 'des_equipe', 'responsavel', 'Supervisor',
+    'eletricistas', 'cod_turno', 'obs_turno', 'OT', 'abertura_turno',
+    'fechamento_turno', 'tempo_intervalo', 'OS/OT', 'UC', 'solicitante', 'bairro',
+    'endereco', 'centro_servico', 'retorno_campo', 'observacao', 'des_tipo_grupo',
+    'des_grupo', 'cod_atividade'
+]
+COLUNAS_REAIS = ['valor_unitario', 'valor_total']
+DATA_INICIO = pd.Timestamp('2021-01-01')
+DATA_FIM = pd.Timestamp('2024-08-31')
+
+# Hora padrão usada para preencher cada coluna de data a partir de `data_servico`
+HORARIOS_PADRAO = {
+    'data_deslocamento': '08:00:00',
+    'data_inicio': '09:00:00',
+    'data_fim': '17:00:00',
+}
+
+
+def colunas_mantidas(caminho, delimiter=';', encoding='utf-8'):
+    """Lê apenas o cabeçalho e devolve as colunas que sobrevivem à Etapa 2."""
+    cabecalho = pd.read_csv(caminho, delimiter=delimiter, encoding=encoding, nrows=0)
+    return [coluna for coluna in cabecalho.columns if coluna not in COLUNAS_REMOVIDAS]
+
+
+def remover_colunas(df):
+    return df.drop(columns=COLUNAS_REMOVIDAS, errors='ignore')
+
+
+def ajustar_coordenadas(df, referencia=None):
+    """Converte latitude/longitude para float, preenche as faltantes pela localidade e arredonda em 6 casas."""
+    if 'latitude' not in df.columns or 'longitude' not in df.columns:
+        return df
+    df['latitude'] = converter_coordenada(df['latitude'])
+    df['longitude'] = converter_coordenada(df['longitude'])
+    if 'localidade' in df.columns:
+        df = preencher_por_localidade(df, referencia)
+    df['latitude'] = arredondar_coordenada(df['latitude'])
+    df['longitude'] = arredondar_coordenada(df['longitude'])
+    return df
+
+
+def corrigir_valores_reais(df):
+    """Remove o separador de milhar e troca a vírgula decimal por ponto."""
+    for col in COLUNAS_REAIS:
+        if col in df.columns:
+            try:
+                df[col] = (
+                    df[col].astype(str)
+                    .str.replace('.', '', regex=False)  # Remover separador de milhar
+                    .str.replace(',', '.', regex=False)  # Substituir vírgula por ponto decimal
+                )
+                df[col] = pd.to_numeric(df[col], errors='coerce')  # Converter para numérico
+            except Exception as e:
+                print(f"Erro ao tratar coluna {col}: {e}")
+    return df
+
+
+def filtrar_periodo(df, data_inicio=DATA_INICIO, data_fim=DATA_FIM):
+    """Converte `data_servico` e mantém apenas o intervalo de `data_inicio` a `data_fim` (None = sem limite)."""
+    if 'data_servico' not in df.columns:
+        return df
+    df['data_servico'] = converter_datas(df['data_servico'], FORMATOS_OPERACIONAL)
+    manter = df['data_servico'].notna()
+    if data_inicio is not None:
+        manter &= df['data_servico'] >= data_inicio
+    if data_fim is not None:
+        manter &= df['data_servico'] <= data_fim
+    return df[manter].copy()
+
+
+def preencher_datas(df):
+    """Preenche as datas ausentes com a data de `data_servico` e o horário padrão."""
+    if 'data_servico' not in df.columns:
+        return df
+    dia_servico = df['data_servico'].dt.normalize()
+    for coluna, horario in HORARIOS_PADRAO.items():
+        if coluna in df.columns:
+            df[coluna] = converter_datas(df[coluna], FORMATOS_OPERACIONAL)
+            df[coluna] = df[coluna].fillna(dia_servico + pd.Timedelta(horario))
+    return df
+
+
+def padronizar_unidade(df):
+    if 'unidade_medida' in df.columns:
+        df['unidade_medida'] = df['unidade_medida'].replace({'UND': 'UN'})
+    return df
+
+
+def adicionar_codigos(df, dicionario):
+    """Cria `tipo_servico_code` e `des_atividade_code`, cada um logo antes da sua coluna.
+
+    Os códigos vêm do `dicionario` persistente (ver `dicionario_codigos`);
+    categorias novas são acrescentadas a ele sem alterar os códigos existentes.
+    """
+    for coluna in ['tipo_servico', 'des_atividade']:
+        if coluna in df.columns:
+            atualizar_dicionario(dicionario, coluna, df[coluna])
+            df[f'{coluna}_code'] = codificar(df[coluna], dicionario[coluna])
+
+    columns_order = list(df.columns)
+    for coluna in ['tipo_servico', 'des_atividade']:
+        if f'{coluna}_code' in columns_order and coluna in columns_order:
+            idx = columns_order.index(coluna)
+            columns_order.insert(idx, columns_order.pop(columns_order.index(f'{coluna}_code')))
+    return df[columns_order]
+
+
+def tratar_bloco(df, referencia_localidades, dicionario, indice_municipios=None,
+                 data_inicio=DATA_INICIO, data_fim=DATA_FIM):
+    """Aplica as Etapas 3 a 8 a um bloco da base operacional.
+
+    A Etapa 8 (município IBGE por ponto-em-polígono) só é aplicada se
+    `indice_municipios` for informado (ver `municipios_ibge`). O período
+    mantido vai de `data_inicio` a `data_fim` (None = sem limite).
+    """
+    df = ajustar_coordenadas(df, referencia_localidades)
+    df = corrigir_valores_reais(df)
+    df = filtrar_periodo(df, data_inicio, data_fim)
+    df = preencher_datas(df)
+    df = padronizar_unidade(df)
+    df = adicionar_codigos(df, dicionario)
+    if indice_municipios is not None:
+        df['municipio'] = indice_municipios.municipios(df['latitude'], df['longitude'])
+    return df
+
+
+def carregar_indice_municipios():
+    """Índice de municípios IBGE, ou None (com aviso) se o shapefile ou o geopandas/shapely não estiverem disponíveis."""
+    try:
+        from municipios_ibge import IndiceMunicipios
+
+        return IndiceMunicipios.carregar()
+    except (ImportError, FileNotFoundError) as e:
+        print(f"Aviso: município IBGE não será atribuído ({e}).")
+        return None
+
+
+def referencia_localidades_em_blocos(caminho, chunksize, delimiter=';', encoding='utf-8'):
+    """Monta a referência localidade → coordenadas lendo só essas três colunas, bloco a bloco."""
+    referencias = []
+    blocos = pd.read_csv(
+        caminho, delimiter=delimiter, encoding=encoding,
+        usecols=['localidade', 'latitude', 'longitude'], dtype=str, chunksize=chunksize
+    )
+    for bloco in blocos:
+        bloco['latitude'] = converter_coordenada(bloco['latitude'])
+        bloco['longitude'] = converter_coordenada(bloco['longitude'])
+        referencias.append(referencia_por_localidade(bloco))
+    if not referencias:
+        return pd.DataFrame(columns=['latitude', 'longitude'])
+    referencia = pd.concat(referencias)
+    return referencia.groupby(level=0, sort=False).last()